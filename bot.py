@@ -1,26 +1,43 @@
 import os
-import json
-import sqlite3
+import re
+import sys
+import shutil
+import hashlib
 import logging
 import asyncio
-import schedule
 import time
-import fcntl  # Add this import
-from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from datetime import datetime
 from typing import Dict, List, Optional
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, CallbackQueryHandler,
-    ContextTypes, filters
+    ContextTypes, AIORateLimiter, filters
 )
+from telegram.request import HTTPXRequest
 from dotenv import load_dotenv
 
-# Import our custom modules
-from news_scraper import NewsScraper
-from news_summarizer import NewsSummarizer
-from tts_handler import TTSHandler
-from stt_handler import STTHandler
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the single-instance check is skipped there
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # Optional speedup, fall back to the standard json module
+    orjson = None
+
+# Use the libuv-based event loop when available (not on Windows); must happen before the Application is built
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Import our custom modules; the heavy scraping/ML ones are imported lazily by NewsBhaiBot
 from user_preferences import UserPreferences
 from scheduler import NewsScheduler
 
@@ -30,10 +47,151 @@ load_dotenv()
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+    level=os.getenv('LOG_LEVEL', 'INFO').upper()
 )
 logger = logging.getLogger(__name__)
 
+# Updates handled at once; one slow chat (STT/TTS) no longer stalls the others
+MAX_CONCURRENT_UPDATES = 32
+
+# Threads behind asyncio.to_thread: feed/page parsing, Whisper, TTS and SQLite all share them
+WORKER_THREADS = min(32, (os.cpu_count() or 1) * 4)
+
+# Held with flock while the bot runs so a second instance refuses to start
+LOCK_FILE = 'news_bhai.lock'
+
+# How long scraped news and generated digests are reused before refetching
+NEWS_CACHE_TTL = 300  # 5 minutes in seconds
+
+# Messages matching this are treated as news queries; (?i) avoids lowercasing a copy
+NEWS_QUERY_RE = re.compile(r'(?i)\b(?:news|kya\s*hua|what\s*happened|update|bhai)')
+NEWS_QUERY_SCAN_CHARS = 256
+
+# Generated voice notes are kept on disk and reused for identical text
+VOICE_CACHE_DIR = 'voice_cache'
+VOICE_CACHE_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+
+SAMPLE_NEWS_TEXT = """📰 **Sample News Update**
+
+🏛️ **Politics**: Bhai, aaj Parliament mein kuch important bills discuss hue hain. Opposition ne kuch points raise kiye hain budget ke baare mein.
+
+💻 **Technology**: Tech world mein ek naya AI model launch hua hai jo kaafi promising lag raha hai. Indian startups bhi is field mein aage badh rahe hain.
+
+⚽ **Sports**: Cricket team ki practice chal rahi hai upcoming series ke liye. Players ka form achha dikh raha hai.
+
+Yeh tha aaj ka quick update! Set up your preferences to get personalized news like this! 🎯"""
+
+HELP_TEXT = """🤖 News Bhai Commands:
+
+📰 News Commands:
+/news - Get latest personalized news
+/topics - Choose your news topics
+
+⚙️ Settings:
+/settings - Manage your preferences
+
+💬 Chat Features:
+• Send text: Ask about any news topic
+• Send voice: Ask questions via voice note
+• I'll respond with both text and voice!
+
+🔹 Supported Languages:
+• Hindi (हिंदी)
+• English
+• Hinglish (Mix of both)
+
+🔹 Available Topics:
+• Politics • Technology • Sports
+• Finance • Entertainment • Health
+• International • Business
+
+Just type your question or send a voice note! 🎤"""
+
+# Static inline keyboards, built once instead of on every callback
+START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("⚙️ Set Preferences", callback_data="setup_preferences")],
+    [InlineKeyboardButton("📰 Get Sample News", callback_data="sample_news")]
+])
+
+SETTINGS_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🌐 Language", callback_data="set_language")],
+    [InlineKeyboardButton("📊 Topics", callback_data="set_topics")],
+    [InlineKeyboardButton("⏰ Frequency", callback_data="set_frequency")],
+    [InlineKeyboardButton("🔄 Reset All", callback_data="reset_settings")]
+])
+
+SETUP_PREFERENCES_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("⚙️ Set My Preferences", callback_data="setup_preferences")]
+])
+
+CHOOSE_TOPICS_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Choose Topics", callback_data="set_topics")]
+])
+
+LANGUAGE_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🇮🇳 Hindi (हिंदी)", callback_data="lang_hindi")],
+    [InlineKeyboardButton("🇬🇧 English", callback_data="lang_english")],
+    [InlineKeyboardButton("🔄 Hinglish (Mix)", callback_data="lang_hinglish")]
+])
+
+FREQUENCY_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📅 Once a day", callback_data="freq_daily")],
+    [InlineKeyboardButton("📅 Twice a day", callback_data="freq_twice_daily")],
+    [InlineKeyboardButton("📅 Weekly", callback_data="freq_weekly")],
+    [InlineKeyboardButton("🔔 On request only", callback_data="freq_on_request")]
+])
+
+LANGUAGE_NAMES = {
+    'hindi': 'Hindi (हिंदी)',
+    'english': 'English',
+    'hinglish': 'Hinglish (Mix)'
+}
+
+FREQUENCY_NAMES = {
+    'daily': 'Once a day',
+    'twice_daily': 'Twice a day',
+    'weekly': 'Weekly',
+    'on_request': 'On request only'
+}
+
+# Topic selection buttons, in the order they're laid out two per row
+TOPIC_LABELS = {
+    'politics': '🏛️ Politics',
+    'technology': '💻 Technology',
+    'sports': '⚽ Sports',
+    'finance': '💰 Finance',
+    'entertainment': '🎬 Entertainment',
+    'health': '🏥 Health',
+    'international': '🌍 International',
+    'business': '🏢 Business',
+    'current_affairs': '📰 Current Affairs'
+}
+
+TOPIC_SELECTION_TEXT = "📚 Select your news topics of interest:\n(You can select multiple topics)"
+
+@lru_cache(maxsize=256)
+def build_topic_keyboard(selected_topics: frozenset) -> InlineKeyboardMarkup:
+    """Build the topic selection keyboard with checkmarks, cached per selection"""
+    buttons = [
+        InlineKeyboardButton(f"{label} {'✅' if topic in selected_topics else ''}", callback_data=f"topic_{topic}")
+        for topic, label in TOPIC_LABELS.items()
+    ]
+    
+    rows = [list(pair) for pair in zip(buttons[::2], buttons[1::2])]
+    rows.append([InlineKeyboardButton("✅ Done", callback_data="topics_done")])
+    return InlineKeyboardMarkup(rows)
+
+class OrjsonRequest(HTTPXRequest):
+    """HTTPXRequest that decodes Telegram responses with orjson"""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> Dict:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Let the default parser handle invalid UTF-8 and report errors
+            return HTTPXRequest.parse_json_payload(payload)
+
 class NewsBhaiBot:
     # In the NewsBhaiBot class, modify the __init__ method
     def __init__(self, token=None):
@@ -41,25 +199,93 @@ class NewsBhaiBot:
         if not self.token:
             raise ValueError("Please set TELEGRAM_BOT_TOKEN in your .env file or provide it as a parameter")
         
-        # Initialize components
+        # Initialize components; scraper, summarizer, TTS and STT are loaded in post_init
         self.user_prefs = UserPreferences()
-        self.news_scraper = NewsScraper()
-        # Disable auto scraping on startup
-        self.news_scraper.set_auto_scrape(False)
-        self.summarizer = NewsSummarizer()
-        self.tts_handler = TTSHandler()
-        self.stt_handler = STTHandler()
         self.scheduler = NewsScheduler(self)
         
+        # Short-lived caches shared across users asking for the same topics
+        self.news_cache: Dict[tuple, tuple] = {}
+        self.digest_cache: Dict[tuple, tuple] = {}
+        self.cache_locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Per-user locks so a user can't run several /news pipelines at once
+        self.user_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Per-user locks keeping topic toggles (and their keyboard edits) in order
+        self.topic_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Telegram file_ids of voice notes already uploaded, keyed by cached file path
+        self.voice_file_ids: Dict[str, str] = {}
+        # Voice notes being synthesized right now, keyed like the voice cache
+        self.voice_generations: Dict[str, asyncio.Task] = {}
+        
+        # References to fire-and-forget tasks so they aren't garbage collected early
+        self.background_tasks = set()
+        
         # Flag to track if test message has been sent
         self.test_message_sent = False
         
-        # Create application
-        self.application = Application.builder().token(self.token).build()
+        # Create application; process updates concurrently and stay inside Telegram's flood limits
+        request_class = OrjsonRequest if orjson is not None else HTTPXRequest
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            # Keep-alive pool big enough for concurrent handlers to reuse TLS connections,
+            # with a longer pool timeout so bursts queue instead of failing
+            .request(request_class(
+                connection_pool_size=256,
+                connect_timeout=10,
+                read_timeout=30,
+                write_timeout=30,
+                pool_timeout=5
+            ))
+            .get_updates_request(request_class())
+            .concurrent_updates(MAX_CONCURRENT_UPDATES)
+            .rate_limiter(AIORateLimiter())
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
+            .build()
+        )
         self.setup_handlers()
         
-        # Start cache cleaning scheduler
-        self.cache_cleaning_task = None
+        # Button callback dispatch: exact callback data, and prefixes whose handler takes the value
+        self.callback_handlers = {
+            "setup_preferences": self.setup_preferences_flow,
+            "set_topics": self.show_topic_options,
+            "sample_news": self.send_sample_news,
+            "set_language": self.show_language_options,
+            "set_frequency": self.show_frequency_options,
+            # Handle the Done button after topic selection
+            "topics_done": self.show_frequency_options
+        }
+        self.callback_prefix_handlers = {
+            "topic": self.toggle_user_topic,
+            "lang": self.set_user_language,
+            "freq": self.set_user_frequency
+        }
+    
+    @cached_property
+    def news_scraper(self):
+        """News scraper, created off the event loop in post_init"""
+        from news_scraper import NewsScraper
+        return NewsScraper()
+    
+    @cached_property
+    def summarizer(self):
+        """Summarization model, loaded off the event loop in post_init"""
+        from news_summarizer import NewsSummarizer
+        return NewsSummarizer()
+    
+    @cached_property
+    def tts_handler(self):
+        """Text-to-speech models, loaded off the event loop in post_init"""
+        from tts_handler import TTSHandler
+        return TTSHandler()
+    
+    @cached_property
+    def stt_handler(self):
+        """Whisper speech-to-text model, loaded off the event loop in post_init"""
+        from stt_handler import STTHandler
+        return STTHandler()
     
     def setup_handlers(self):
         """Set up all command and message handlers"""
@@ -67,15 +293,16 @@ class NewsBhaiBot:
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
         self.application.add_handler(CommandHandler("settings", self.settings_command))
-        self.application.add_handler(CommandHandler("news", self.news_command))
+        # Slow handlers (scraping, summarizing, TTS/STT) run non-blocking
+        self.application.add_handler(CommandHandler("news", self.news_command, block=False))
         self.application.add_handler(CommandHandler("topics", self.topics_command))
         
         # Callback query handler for inline keyboards
-        self.application.add_handler(CallbackQueryHandler(self.button_callback))
+        self.application.add_handler(CallbackQueryHandler(self.button_callback, block=False))
         
         # Message handlers
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_text_message))
-        self.application.add_handler(MessageHandler(filters.VOICE, self.handle_voice_message))
+        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_text_message, block=False))
+        self.application.add_handler(MessageHandler(filters.VOICE, self.handle_voice_message, block=False))
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -100,43 +327,11 @@ I'm your personal news buddy who will keep you updated with current affairs in y
 
 Let's set up your preferences first! 👇"""
         
-        keyboard = [
-            [InlineKeyboardButton("⚙️ Set Preferences", callback_data="setup_preferences")],
-            [InlineKeyboardButton("📰 Get Sample News", callback_data="sample_news")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(welcome_message, reply_markup=reply_markup)
+        await update.message.reply_text(welcome_message, reply_markup=START_KEYBOARD)
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        help_text = """🤖 News Bhai Commands:
-
-📰 News Commands:
-/news - Get latest personalized news
-/topics - Choose your news topics
-
-⚙️ Settings:
-/settings - Manage your preferences
-
-💬 Chat Features:
-• Send text: Ask about any news topic
-• Send voice: Ask questions via voice note
-• I'll respond with both text and voice!
-
-🔹 Supported Languages:
-• Hindi (हिंदी)
-• English
-• Hinglish (Mix of both)
-
-🔹 Available Topics:
-• Politics • Technology • Sports
-• Finance • Entertainment • Health
-• International • Business
-
-Just type your question or send a voice note! 🎤"""
-        
-        await update.message.reply_text(help_text)
+        await update.message.reply_text(HELP_TEXT)
     
     async def settings_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settings command"""
@@ -151,15 +346,7 @@ Just type your question or send a voice note! 🎤"""
 
 What would you like to change?"""
         
-        keyboard = [
-            [InlineKeyboardButton("🌐 Language", callback_data="set_language")],
-            [InlineKeyboardButton("📊 Topics", callback_data="set_topics")],
-            [InlineKeyboardButton("⏰ Frequency", callback_data="set_frequency")],
-            [InlineKeyboardButton("🔄 Reset All", callback_data="reset_settings")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(settings_text, reply_markup=reply_markup)
+        await update.message.reply_text(settings_text, reply_markup=SETTINGS_KEYBOARD)
     
     async def news_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /news command"""
@@ -168,94 +355,42 @@ What would you like to change?"""
     
     async def topics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /topics command"""
-        topics_text = """📊 Available News Topics:
-
-Choose the topics you're interested in:"""
-        
-        keyboard = [
-            [InlineKeyboardButton("🏛️ Politics", callback_data="topic_politics"),
-             InlineKeyboardButton("💻 Technology", callback_data="topic_technology")],
-            [InlineKeyboardButton("⚽ Sports", callback_data="topic_sports"),
-             InlineKeyboardButton("💰 Finance", callback_data="topic_finance")],
-            [InlineKeyboardButton("🎬 Entertainment", callback_data="topic_entertainment"),
-             InlineKeyboardButton("🏥 Health", callback_data="topic_health")],
-            [InlineKeyboardButton("🌍 International", callback_data="topic_international"),
-             InlineKeyboardButton("🏢 Business", callback_data="topic_business")],
-            [InlineKeyboardButton("✅ Done", callback_data="topics_done")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        user_id = update.effective_user.id
+        current_topics = self.user_prefs.get_user_topics(user_id)
         
-        await update.message.reply_text(topics_text, reply_markup=reply_markup)
+        # Same cached keyboard as the setup flow, so current selections show up here too
+        await update.message.reply_text(TOPIC_SELECTION_TEXT, reply_markup=build_topic_keyboard(frozenset(current_topics)))
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks with improved logging"""
         query = update.callback_query
         
-        try:
-            await query.answer()
-        except telegram.error.BadRequest as e:
-            # Handle "Query is too old" errors gracefully
-            logger.warning(f"Could not answer callback query: {e}")
-            # Continue processing the callback anyway
+        # Acknowledge the press in the background instead of waiting for the round trip
+        answer_task = asyncio.create_task(query.answer())
+        self.background_tasks.add(answer_task)
+        answer_task.add_done_callback(self._on_callback_answered)
         
         callback_data = query.data
         user_id = query.from_user.id
         
         # Add detailed logging
-        logger.info(f"Button callback received: {callback_data} from user {user_id}")
+        logger.info("Button callback received: %s from user %s", callback_data, user_id)
         
         try:
-            # Handle topic selection
-            if callback_data.startswith("topic_"):
-                logger.info(f"Processing topic selection: {callback_data}")
-                topic = callback_data.replace("topic_", "")
-                current_topics = self.user_prefs.get_user_topics(user_id)
-                
-                if topic in current_topics:
-                    # Remove topic if already selected
-                    logger.info(f"Removing topic {topic} for user {user_id}")
-                    self.user_prefs.remove_user_topic(user_id, topic)
-                else:
-                    # Add topic if not selected
-                    logger.info(f"Adding topic {topic} for user {user_id}")
-                    self.user_prefs.add_user_topic(user_id, topic)
-                
-                # Show updated topic options
-                await self.show_topic_options(query)
+            # Exact callback data first, then "<prefix>_<value>" data such as lang_hindi
+            handler = self.callback_handlers.get(callback_data)
+            if handler:
+                await handler(query)
                 return
             
-            # Handle other callbacks with detailed logging
-            if callback_data == "setup_preferences":
-                logger.info(f"Starting preferences setup for user {user_id}")
-                await self.setup_preferences_flow(query)
-            elif callback_data == "set_topics":
-                logger.info(f"Showing topic options for user {user_id}")
-                await self.show_topic_options(query)
-            elif callback_data == "sample_news":
-                logger.info(f"Sending sample news for user {user_id}")
-                await self.send_sample_news(query)
-            elif callback_data == "set_language":
-                logger.info(f"Showing language options for user {user_id}")
-                await self.show_language_options(query)
-            elif callback_data == "set_frequency":
-                logger.info(f"Showing frequency options for user {user_id}")
-                await self.show_frequency_options(query)
-            elif callback_data.startswith("lang_"):
-                language = callback_data.split("_")[1]
-                logger.info(f"Setting language to {language} for user {user_id}")
-                await self.set_user_language(user_id, language, query)
-            elif callback_data.startswith("freq_"):
-                frequency = callback_data.split("_")[1]
-                logger.info(f"Setting frequency to {frequency} for user {user_id}")
-                await self.set_user_frequency(user_id, frequency, query)
-            elif callback_data == "topics_done":
-                logger.info(f"Topics selection completed for user {user_id}")
-                # Handle the Done button after topic selection
-                await self.show_frequency_options(query)
+            prefix, _, value = callback_data.partition("_")
+            prefix_handler = self.callback_prefix_handlers.get(prefix)
+            if prefix_handler and value:
+                await prefix_handler(user_id, value, query)
             else:
-                logger.warning(f"Unknown callback data received: {callback_data} from user {user_id}")
+                logger.warning("Unknown callback data received: %s from user %s", callback_data, user_id)
         except Exception as e:
-            logger.error(f"Error in button_callback: {e}")
+            logger.error("Error in button_callback: %s", e)
             # Provide feedback to user when an error occurs
             try:
                 await query.edit_message_text("Sorry, an error occurred. Please try again or use /start to restart.")
@@ -264,7 +399,34 @@ Choose the topics you're interested in:"""
                 try:
                     await query.message.reply_text("Sorry, an error occurred. Please try again or use /start to restart.")
                 except Exception as e2:
-                    logger.error(f"Failed to notify user of error: {e2}")
+                    logger.error("Failed to notify user of error: %s", e2)
+    
+    async def toggle_user_topic(self, user_id: int, topic: str, query):
+        """Add or remove a topic from the user's selection"""
+        async with self.topic_locks[user_id]:
+            current_topics = self.user_prefs.get_user_topics(user_id)
+            
+            if topic in current_topics:
+                # Remove topic if already selected
+                logger.info("Removing topic %s for user %s", topic, user_id)
+                self.user_prefs.remove_user_topic(user_id, topic)
+            else:
+                # Add topic if not selected
+                logger.info("Adding topic %s for user %s", topic, user_id)
+                self.user_prefs.add_user_topic(user_id, topic)
+            
+            # Only the checkmarks change, so swap the keyboard and skip the edit if it's already shown
+            markup = build_topic_keyboard(frozenset(self.user_prefs.get_user_topics(user_id)))
+            if query.message and query.message.reply_markup == markup:
+                return
+            await query.edit_message_reply_markup(reply_markup=markup)
+    
+    def _on_callback_answered(self, task: asyncio.Task):
+        """Log failures of the background callback query answer"""
+        self.background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            # Handle "Query is too old" errors gracefully; the callback is processed anyway
+            logger.warning("Could not answer callback query: %s", task.exception())
     
     async def setup_preferences_flow(self, query):
         """Start the preferences setup flow"""
@@ -272,106 +434,42 @@ Choose the topics you're interested in:"""
 
 Choose your preferred language:"""
         
-        keyboard = [
-            [InlineKeyboardButton("🇮🇳 Hindi (हिंदी)", callback_data="lang_hindi")],
-            [InlineKeyboardButton("🇬🇧 English", callback_data="lang_english")],
-            [InlineKeyboardButton("🔄 Hinglish (Mix)", callback_data="lang_hinglish")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, reply_markup=reply_markup)
+        await query.edit_message_text(text, reply_markup=LANGUAGE_KEYBOARD)
     
     async def show_language_options(self, query):
         """Show language selection options"""
         text = "🌐 Choose your preferred language:"
         
-        keyboard = [
-            [InlineKeyboardButton("🇮🇳 Hindi (हिंदी)", callback_data="lang_hindi")],
-            [InlineKeyboardButton("🇬🇧 English", callback_data="lang_english")],
-            [InlineKeyboardButton("🔄 Hinglish (Mix)", callback_data="lang_hinglish")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, reply_markup=reply_markup)
+        await query.edit_message_text(text, reply_markup=LANGUAGE_KEYBOARD)
     
     async def show_topic_options(self, query):
         """Show topic selection options"""
         user_id = query.from_user.id
         current_topics = self.user_prefs.get_user_topics(user_id)
         
-        all_topics = {
-            'politics': '🏛️ Politics',
-            'business': '🏢 Business',
-            'technology': '💻 Technology',
-            'sports': '⚽ Sports',
-            'entertainment': '🎬 Entertainment',
-            'health': '🏥 Health',
-            'international': '🌍 International',
-            'current_affairs': '📰 Current Affairs'
-        }
-        
-        topics_text = "📚 Select your news topics of interest:\n"
-        topics_text += "(You can select multiple topics)"
-        
-        keyboard = [
-            [InlineKeyboardButton(f"{all_topics['politics']} {'✅' if 'politics' in current_topics else ''}", callback_data="topic_politics"),
-             InlineKeyboardButton(f"{all_topics['technology']} {'✅' if 'technology' in current_topics else ''}", callback_data="topic_technology")],
-            [InlineKeyboardButton(f"{all_topics['sports']} {'✅' if 'sports' in current_topics else ''}", callback_data="topic_sports"),
-             InlineKeyboardButton(f"{all_topics['entertainment']} {'✅' if 'entertainment' in current_topics else ''}", callback_data="topic_entertainment")],
-            [InlineKeyboardButton(f"{all_topics['health']} {'✅' if 'health' in current_topics else ''}", callback_data="topic_health"),
-             InlineKeyboardButton(f"{all_topics['international']} {'✅' if 'international' in current_topics else ''}", callback_data="topic_international")],
-            [InlineKeyboardButton(f"{all_topics['business']} {'✅' if 'business' in current_topics else ''}", callback_data="topic_business"),
-             InlineKeyboardButton(f"{all_topics['current_affairs']} {'✅' if 'current_affairs' in current_topics else ''}", callback_data="topic_current_affairs")],
-            [InlineKeyboardButton("✅ Done", callback_data="topics_done")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(topics_text, reply_markup=reply_markup)
+        await query.edit_message_text(TOPIC_SELECTION_TEXT, reply_markup=build_topic_keyboard(frozenset(current_topics)))
     
     async def show_frequency_options(self, query):
         """Show frequency selection options"""
         text = "⏰ How often would you like to receive news updates?"
         
-        keyboard = [
-            [InlineKeyboardButton("📅 Once a day", callback_data="freq_daily")],
-            [InlineKeyboardButton("📅 Twice a day", callback_data="freq_twice_daily")],
-            [InlineKeyboardButton("📅 Weekly", callback_data="freq_weekly")],
-            [InlineKeyboardButton("🔔 On request only", callback_data="freq_on_request")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, reply_markup=reply_markup)
+        await query.edit_message_text(text, reply_markup=FREQUENCY_KEYBOARD)
     
     async def set_user_language(self, user_id: int, language: str, query):
         """Set user's language preference"""
         self.user_prefs.update_user_preference(user_id, 'language', language)
         
-        lang_names = {
-            'hindi': 'Hindi (हिंदी)',
-            'english': 'English',
-            'hinglish': 'Hinglish (Mix)'
-        }
-        
         await query.edit_message_text(
-            f"✅ Language set to {lang_names[language]}!\n\nNow let's choose your topics of interest.",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("📊 Choose Topics", callback_data="set_topics")]
-            ])
+            f"✅ Language set to {LANGUAGE_NAMES[language]}!\n\nNow let's choose your topics of interest.",
+            reply_markup=CHOOSE_TOPICS_KEYBOARD
         )
     
     async def set_user_frequency(self, user_id: int, frequency: str, query):
         """Set user's update frequency preference"""
         self.user_prefs.update_user_preference(user_id, 'frequency', frequency)
         
-        freq_names = {
-            'daily': 'Once a day',
-            'twice_daily': 'Twice a day',
-            'weekly': 'Weekly',
-            'on_request': 'On request only'
-        }
-        
         await query.edit_message_text(
-            f"✅ Update frequency set to {freq_names[frequency]}!\n\n🎉 Setup complete! You can now use /news to get your personalized updates."
+            f"✅ Update frequency set to {FREQUENCY_NAMES[frequency]}!\n\n🎉 Setup complete! You can now use /news to get your personalized updates."
         )
     
     async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -380,8 +478,9 @@ Choose your preferred language:"""
         user_message = update.message.text
         
         # Check if it's a news-related query
-        if any(keyword in user_message.lower() for keyword in ['news', 'kya hua', 'what happened', 'update', 'bhai']):
-            await self.handle_news_query(user_id, user_message, update)
+        # News triggers sit at the start of a query, so only scan the beginning of long messages
+        if NEWS_QUERY_RE.search(user_message, 0, NEWS_QUERY_SCAN_CHARS):
+            await self.handle_news_query(user_id, user_message, update, context)
         else:
             await update.message.reply_text(
                 "🤔 I'm specialized in news updates! Try asking about current events or use /news for latest updates."
@@ -392,41 +491,34 @@ Choose your preferred language:"""
         user_id = update.effective_user.id
         
         try:
-            # Download voice file
+            # Download voice file into memory, no temp file on disk
             voice_file = await update.message.voice.get_file()
-            voice_path = f"temp_voice_{user_id}.ogg"
-            await voice_file.download_to_drive(voice_path)
+            voice_bytes = await voice_file.download_as_bytearray()
             
             # Transcribe voice to text
-            transcribed_text = await self.stt_handler.transcribe_audio(voice_path)
-            
-            # Clean up temp file
-            os.remove(voice_path)
+            transcribed_text = await self.stt_handler.transcribe_audio(voice_bytes)
             
             if transcribed_text:
                 await update.message.reply_text(f"🎤 I heard: \"{transcribed_text}\"\n\nLet me get that news for you...")
-                await self.handle_news_query(user_id, transcribed_text, update)
+                await self.handle_news_query(user_id, transcribed_text, update, context)
             else:
                 await update.message.reply_text("😅 Sorry, I couldn't understand the audio. Please try again or send a text message.")
                 
         except Exception as e:
-            logger.error(f"Error handling voice message: {e}")
+            logger.error("Error handling voice message: %s", e)
             await update.message.reply_text("😅 Sorry, there was an error processing your voice message. Please try again.")
     
-    async def handle_news_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_news_query(self, user_id: int, query_text: str, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle news query and send news"""
-        user_id = update.effective_user.id
         prefs = self.user_prefs.get_user_preferences(user_id)
         language = prefs.get('language', 'english')
         topics = prefs.get('topics', [])
         
         if not topics:
             # If no topics selected, prompt user to set preferences
-            keyboard = [[InlineKeyboardButton("⚙️ Set My Preferences", callback_data="setup_preferences")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
             await update.message.reply_text(
                 "You haven't set your news preferences yet. Set them up to get personalized news!",
-                reply_markup=reply_markup
+                reply_markup=SETUP_PREFERENCES_KEYBOARD
             )
             return
         
@@ -434,135 +526,289 @@ Choose your preferred language:"""
         await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
         
         try:
-            # Get news based on user preferences
-            news_items = []
-            for topic in topics:
-                # Add current affairs special handling
-                if topic == 'current_affairs':
-                    current_news = await self.news_scraper.scrape_current_affairs()
-                    news_items.extend(current_news)
-                else:
-                    topic_news = await self.news_scraper.get_latest_news([topic])
-                    news_items.extend(topic_news)
+            # Get news based on user preferences in a single batched fetch
+            news_items = await self.get_cached(
+                self.news_cache, ('query', frozenset(topics)),
+                lambda: self.fetch_topics_news(topics)
+            )
             
             if not news_items:
                 await update.message.reply_text("Sorry, couldn't find any news matching your preferences right now.")
                 return
             
             # Summarize news
-            summary = await self.summarizer.create_news_digest(news_items, language)
+            summary = await self.get_cached(
+                self.digest_cache, ('query', frozenset(topics), language),
+                lambda: self.summarizer.create_news_digest(news_items, language)
+            )
             
             # Send text summary
             await update.message.reply_text(f"📰 **Your News Update**\n\n{summary}")
             
             # Generate and send voice note
-            voice_path = await self.tts_handler.generate_voice_note(summary, language)
-            if voice_path and os.path.exists(voice_path):
-                with open(voice_path, 'rb') as voice_file:
-                    await update.message.reply_voice(voice_file)
-                os.remove(voice_path)
+            voice_path = await self.get_voice_note(summary, language)
+            if voice_path:
+                await self.send_voice_note(update.effective_chat.id, voice_path)
                 
         except Exception as e:
-            logger.error(f"Error handling news query: {e}")
+            logger.error("Error handling news query: %s", e)
             await update.message.reply_text("😅 Sorry, couldn't fetch news right now. Try again later!")
     
-    # Add this method to the NewsBhaiBot class
+    async def get_cached(self, cache: Dict[tuple, tuple], key: tuple, factory):
+        """Return a cached value younger than NEWS_CACHE_TTL, computing it once per key on a miss"""
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < NEWS_CACHE_TTL:
+            return entry[1]
+        
+        # Only one caller recomputes a key; concurrent callers wait and reuse its result
+        async with self.cache_locks[key]:
+            entry = cache.get(key)
+            now = time.monotonic()
+            if entry and now - entry[0] < NEWS_CACHE_TTL:
+                return entry[1]
+            
+            value = await factory()
+            
+            # Drop expired entries so the cache doesn't grow without bound
+            for stale_key in [k for k, (ts, _) in cache.items() if now - ts >= NEWS_CACHE_TTL]:
+                del cache[stale_key]
+            cache[key] = (time.monotonic(), value)
+            return value
+    
+    async def fetch_topics_news(self, topics: List[str]) -> List[Dict]:
+        """Fetch news for all topics with one batched scrape plus current affairs if requested"""
+        other_topics = [topic for topic in topics if topic != 'current_affairs']
+        
+        fetches = []
+        if other_topics:
+            fetches.append(self.news_scraper.get_latest_news(other_topics))
+        # Add current affairs special handling
+        if 'current_affairs' in topics:
+            fetches.append(self.news_scraper.scrape_current_affairs())
+        
+        results = await asyncio.gather(*fetches, return_exceptions=True)
+        
+        news_items = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error fetching news: %s", result)
+                continue
+            news_items.extend(result)
+        return news_items
+    
     async def send_personalized_news(self, user_id: int, update: Update):
+        """Send personalized news to user, ignoring repeat requests while one is in progress"""
+        lock = self.user_locks[user_id]
+        if lock.locked():
+            await update.message.reply_text("⏳ Still fetching your last request, bhai! Hang on...")
+            return
+        
+        async with lock:
+            await self._send_personalized_news(user_id, update)
+    
+    async def _send_personalized_news(self, user_id: int, update: Update):
         """Send personalized news to user with proper error handling"""
         try:
-            # Show typing indicator immediately
-            await update.message.reply_text("🔍 Fetching your personalized news... Please wait a moment.")
-            await update.effective_chat.send_chat_action(action="typing")
+            # Show typing indicator immediately; the status message is edited into the digest later
+            status_message, _ = await asyncio.gather(
+                update.message.reply_text("🔍 Fetching your personalized news... Please wait a moment."),
+                update.effective_chat.send_chat_action(action="typing")
+            )
             
             prefs = self.user_prefs.get_user_preferences(user_id)
             language = prefs.get('language', 'english')
             topics = prefs.get('topics', ['general'])
             
-            # Enable auto scraping only when explicitly requested
-            self.news_scraper.set_auto_scrape(True)
-            
             try:
                 # Get latest news with retry mechanism
-                news_data = await self.news_scraper.get_latest_news(topics, limit=15)
-                
-                # Disable auto scraping after fetching
-                self.news_scraper.set_auto_scrape(False)
+                news_data = await self.get_cached(
+                    self.news_cache, ('personalized', frozenset(topics)),
+                    lambda: self.news_scraper.get_latest_news(topics, limit=15)
+                )
                 
                 if not news_data:
                     await update.message.reply_text("😅 No news available right now, bhai! Try again later.")
                     return
                 
                 # Summarize news for 30-second voice note
-                summary = await self.summarizer.create_news_digest(news_data, language, max_length=200)
+                summary = await self.get_cached(
+                    self.digest_cache, ('personalized', frozenset(topics), language),
+                    lambda: self.summarizer.create_news_digest(news_data, language, max_length=200)
+                )
                 
                 # Send text summary first
-                await update.message.reply_text(f"📰 **Your News Update**\n\n{summary}")
+                await status_message.edit_text(f"📰 **Your News Update**\n\n{summary}")
                 
                 # Generate and send 30-second voice note
-                voice_path = await self.tts_handler.generate_voice_note(summary, language, max_duration=30)
-                if voice_path and os.path.exists(voice_path):
-                    with open(voice_path, 'rb') as voice_file:
-                        await update.message.reply_voice(voice_file, caption="🎧 Your 30-second news summary")
-                    os.remove(voice_path)
+                voice_path = await self.get_voice_note(summary, language, max_duration=30)
+                if voice_path:
+                    await self.send_voice_note(update.effective_chat.id, voice_path, caption="🎧 Your 30-second news summary")
                 else:
                     await update.message.reply_text("📝 Voice note generation failed, but here's your text summary above!")
                     
             except Exception as e:
-                logger.error(f"Error in news fetching: {e}")
+                logger.error("Error in news fetching: %s", e)
                 await update.message.reply_text("😅 Sorry bhai, couldn't fetch news right now. Try again later!")
-                # Make sure to disable auto scraping in case of error
-                self.news_scraper.set_auto_scrape(False)
             
         except Exception as e:
-            logger.error(f"Error setting up news fetch: {e}")
+            logger.error("Error setting up news fetch: %s", e)
             await update.message.reply_text("😅 Sorry bhai, couldn't start fetching news. Try again later!")
     
+    async def get_voice_note(self, text: str, language: str, max_duration: int = 30) -> Optional[str]:
+        """Get a voice note for the text, reusing a cached copy on disk when available"""
+        key = hashlib.sha256(f"{language}\0{max_duration}\0{text}".encode()).hexdigest()
+        cached_path = os.path.join(VOICE_CACHE_DIR, f"{key}.ogg")
+        
+        if os.path.exists(cached_path):
+            # Mark as recently used so eviction keeps it
+            os.utime(cached_path)
+            return cached_path
+        
+        # Concurrent requests for the same note share one synthesis instead of each running TTS
+        task = self.voice_generations.get(key)
+        if task is None:
+            task = asyncio.create_task(self._generate_voice_note(text, language, max_duration, cached_path))
+            self.voice_generations[key] = task
+            task.add_done_callback(lambda _: self.voice_generations.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the note for the others
+        return await asyncio.shield(task)
+    
+    async def _generate_voice_note(self, text: str, language: str, max_duration: int, cached_path: str) -> Optional[str]:
+        """Synthesize a voice note and move it into the voice cache"""
+        voice_path = await self.tts_handler.generate_voice_note(text, language, max_duration=max_duration)
+        if not voice_path or not os.path.exists(voice_path):
+            return None
+        
+        os.makedirs(VOICE_CACHE_DIR, exist_ok=True)
+        shutil.move(voice_path, cached_path)
+        self.evict_voice_cache()
+        return cached_path
+    
+    async def send_voice_note(self, chat_id: int, voice_path: str, caption: Optional[str] = None):
+        """Send a cached voice note, reusing Telegram's file_id once it has been uploaded"""
+        file_id = self.voice_file_ids.get(voice_path)
+        if file_id:
+            return await self.application.bot.send_voice(chat_id=chat_id, voice=file_id, caption=caption)
+        
+        # Read the file in a worker thread so the upload doesn't block the event loop
+        voice_bytes = await asyncio.to_thread(self._read_file, voice_path)
+        voice_file = InputFile(voice_bytes, filename=os.path.basename(voice_path))
+        message = await self.application.bot.send_voice(chat_id=chat_id, voice=voice_file, caption=caption)
+        self.voice_file_ids[voice_path] = message.voice.file_id
+        return message
+    
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        """Read a whole file (blocking, called from a worker thread)"""
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def evict_voice_cache(self):
+        """Remove least recently used voice notes once the cache grows past its size limit"""
+        try:
+            entries = []
+            total_size = 0
+            with os.scandir(VOICE_CACHE_DIR) as it:
+                for entry in it:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_atime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+            
+            # Oldest access time first
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= VOICE_CACHE_MAX_BYTES:
+                    break
+                os.remove(path)
+                self.voice_file_ids.pop(path, None)
+                total_size -= size
+        except Exception as e:
+            logger.warning("Could not evict voice cache: %s", e)
+    
     async def send_sample_news(self, query):
         """Send a sample news update"""
-        sample_news = """📰 **Sample News Update**
-
-🏛️ **Politics**: Bhai, aaj Parliament mein kuch important bills discuss hue hain. Opposition ne kuch points raise kiye hain budget ke baare mein.
-
-💻 **Technology**: Tech world mein ek naya AI model launch hua hai jo kaafi promising lag raha hai. Indian startups bhi is field mein aage badh rahe hain.
-
-⚽ **Sports**: Cricket team ki practice chal rahi hai upcoming series ke liye. Players ka form achha dikh raha hai.
-
-Yeh tha aaj ka quick update! Set up your preferences to get personalized news like this! 🎯"""
-        
-        keyboard = [
-            [InlineKeyboardButton("⚙️ Set My Preferences", callback_data="setup_preferences")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        sample_news = SAMPLE_NEWS_TEXT
         
         # First send as text
-        await query.edit_message_text(sample_news, reply_markup=reply_markup)
+        await query.edit_message_text(sample_news, reply_markup=SETUP_PREFERENCES_KEYBOARD)
         
         # Then send as voice note
         try:
             # Get chat ID from the query
             chat_id = query.message.chat_id
             
-            # Generate voice note (using hinglish as it's a mix)
-            voice_path = await self.tts_handler.generate_voice_note(sample_news, 'hinglish')
+            # Generate voice note (using hinglish as it's a mix); cached after the first run
+            voice_path = await self.get_voice_note(sample_news, 'hinglish')
             
-            if voice_path and os.path.exists(voice_path):
+            if voice_path:
                 # Send voice note
-                with open(voice_path, 'rb') as voice_file:
-                    await query.bot.send_voice(chat_id=chat_id, voice=voice_file, caption="🎧 Here's your audio news update!")
-                # Clean up the file
-                os.remove(voice_path)
+                await self.send_voice_note(chat_id, voice_path, caption="🎧 Here's your audio news update!")
         except Exception as e:
-            logger.error(f"Error sending sample news voice note: {e}")
+            logger.error("Error sending sample news voice note: %s", e)
     
-    def run(self):
-        """Start the bot"""
-        logger.info("Starting News Bhai Bot...")
+    async def post_init(self, application: Application):
+        """Start background tasks once the application's event loop is running"""
+        # Python 3.12+: run new tasks synchronously until their first await (cache hits never hit the loop queue)
+        if sys.version_info >= (3, 12):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        
+        # Size the default executor explicitly so parsing keeps up with concurrent fetches
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix='news_bhai')
+        )
+        
+        # Import the scraper and load every model on worker threads before polling starts, so no handler
+        # (or the startup tasks below) ends up building one on the event loop
+        for component in ('news_scraper', 'summarizer', 'tts_handler', 'stt_handler'):
+            await asyncio.to_thread(getattr, self, component)
+        logger.info("News scraper and models loaded")
         
-        # Start the scheduler
         self.scheduler.start()
         logger.info("Scheduler started")
         
-        # Run the application with proper async handling
+        # Run the slow startup work in the background so polling starts right away
+        task = asyncio.create_task(self.run_startup_tasks())
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+    
+    async def run_startup_tasks(self):
+        """Warm caches, greet active users and sweep leftover temp files"""
+        try:
+            # Resolve and connect to the feed hosts before the first news request needs them
+            await self.news_scraper.warmup()
+            
+            # Pre-generate the constant sample news voice note
+            await self.get_voice_note(SAMPLE_NEWS_TEXT, 'hinglish')
+            await self.send_startup_test_message()
+            await self.clean_cache()
+            
+            logger.info("Bot startup tasks completed")
+            
+        except Exception as e:
+            logger.error("Error in startup tasks: %s", e)
+    
+    async def post_shutdown(self, application: Application):
+        """Stop background tasks when the application shuts down"""
+        await self.scheduler.stop()
+        
+        # Cancel leftover background work (startup tasks, callback answers) and let it unwind
+        pending = [task for task in self.background_tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=5)
+        
+        # Only close the scraper's HTTP session if the scraper was ever created
+        if 'news_scraper' in self.__dict__:
+            await self.news_scraper.close()
+        self.user_prefs.close()
+    
+    def run(self):
+        """Start the bot"""
+        logger.info("Starting News Bhai Bot...")
+        
+        # Run the application with proper async handling; the scheduler starts in post_init
         self.application.run_polling()
     
     async def send_startup_test_message(self):
@@ -585,10 +831,14 @@ Yeh tha aaj ka quick update! Set up your preferences to get personalized news li
                 'timestamp': datetime.now().isoformat()
             }
             
-            for user_id in active_users[:5]:  # Limit to first 5 users
+            # Load everyone's preferences in one query
+            active_users = active_users[:5]  # Limit to first 5 users
+            all_prefs = self.user_prefs.get_preferences_bulk(active_users)
+            
+            async def notify(user_id: int):
                 try:
                     # Get user preferences
-                    prefs = self.user_prefs.get_user_preferences(user_id)
+                    prefs = all_prefs[user_id]
                     language = prefs.get('language', 'english')
                     
                     # Send text message
@@ -600,144 +850,78 @@ Yeh tha aaj ka quick update! Set up your preferences to get personalized news li
                     )
                     
                     # Generate and send voice note
-                    voice_path = self.tts_handler.text_to_speech(
-                        sample_news['content'], 
-                        language
-                    )
+                    voice_path = await self.get_voice_note(sample_news['content'], language)
                     
-                    if voice_path and os.path.exists(voice_path):
-                        with open(voice_path, 'rb') as voice_file:
-                            await self.application.bot.send_voice(
-                                chat_id=user_id, 
-                                voice=voice_file, 
-                                caption="🎧 Here's your audio news update!"
-                            )
-                        # Clean up the file
-                        os.remove(voice_path)
+                    if voice_path:
+                        await self.send_voice_note(user_id, voice_path, caption="🎧 Here's your audio news update!")
                         
-                    logger.info(f"Sent startup message to user {user_id}")
+                    logger.info("Sent startup message to user %s", user_id)
                     
                 except Exception as e:
-                    logger.error(f"Error sending startup message to user {user_id}: {e}")
+                    logger.error("Error sending startup message to user %s: %s", user_id, e)
+            
+            # Notify users concurrently; the application's rate limiter keeps sends within Telegram's limits
+            await asyncio.gather(*(notify(user_id) for user_id in active_users))
                     
         except Exception as e:
-            logger.error(f"Error in send_startup_test_message: {e}")
+            logger.error("Error in send_startup_test_message: %s", e)
     
     async def clean_cache(self):
-        """Clean temporary files created by the bot"""
+        """Remove temp voice files left behind by a crash; normal runs clean up after themselves"""
         try:
             import tempfile
-            import glob
             
             temp_dir = tempfile.gettempdir()
-            logger.info(f"Cleaning cache in {temp_dir}")
-            
-            # Clean voice note files
-            voice_patterns = [
-                os.path.join(temp_dir, "voice_note_*.ogg"),
-                os.path.join(temp_dir, "voice_note_*.wav")
-            ]
+            logger.info("Cleaning cache in %s", temp_dir)
             
             files_removed = 0
-            for pattern in voice_patterns:
-                for file_path in glob.glob(pattern):
+            now = time.time()
+            # scandir hands back stat info with each entry instead of a glob + stat per file
+            with os.scandir(temp_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if not (name.startswith("voice_note_") and name.endswith(('.ogg', '.wav'))):
+                        continue
                     try:
                         # Check if file is older than 5 minutes to avoid deleting files in use
-                        file_age = time.time() - os.path.getmtime(file_path)
-                        if file_age > 300:  # 5 minutes in seconds
-                            os.remove(file_path)
+                        if now - entry.stat(follow_symlinks=False).st_mtime > 300:  # 5 minutes in seconds
+                            os.unlink(entry.path)
                             files_removed += 1
                     except Exception as e:
-                        logger.warning(f"Could not remove cache file {file_path}: {e}")
+                        logger.warning("Could not remove cache file %s: %s", entry.path, e)
             
             if files_removed > 0:
-                logger.info(f"Removed {files_removed} cache files")
+                logger.info("Removed %s cache files", files_removed)
                 
         except Exception as e:
-            logger.error(f"Error cleaning cache: {e}")
-    
-    async def start_cache_cleaning(self):
-        """Start periodic cache cleaning"""
-        try:
-            # Cancel any existing task
-            if hasattr(self, 'cache_cleaning_task') and self.cache_cleaning_task and not self.cache_cleaning_task.done():
-                self.cache_cleaning_task.cancel()
-            
-            # Run initial cleanup
-            await self.clean_cache()
-            
-            # Schedule periodic cleanup
-            async def periodic_cleanup():
-                while True:
-                    try:
-                        await asyncio.sleep(120)  # 2 minutes
-                        await self.clean_cache()
-                    except asyncio.CancelledError:
-                        break
-                    except Exception as e:
-                        logger.error(f"Error in periodic cache cleaning: {e}")
-                        await asyncio.sleep(60)  # Wait a bit before retrying
-            
-            # Start the periodic task
-            self.cache_cleaning_task = asyncio.create_task(periodic_cleanup())
-            logger.info("Started periodic cache cleaning every 2 minutes")
-            
-        except Exception as e:
-            logger.error(f"Failed to start cache cleaning: {e}")
+            logger.error("Error cleaning cache: %s", e)
 
 # Remove all duplicate code and fix the main execution block
 if __name__ == '__main__':
-    # Check if bot is already running
-    import subprocess
-    try:
-        result = subprocess.run(['pgrep', '-f', 'python.*bot.py'], capture_output=True, text=True)
-        if result.stdout.strip():
+    # Check if bot is already running; the kernel releases the lock when this process exits
+    if fcntl is not None:
+        lock_fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
             print("Bot is already running! Please stop the existing instance first.")
             print("Use: pkill -f 'python.*bot.py' to stop it.")
             exit(1)
-    except:
-        pass  # pgrep might not be available on all systems
     
     # Main bot execution with proper try-except structure
     try:
-        import sys
         token = sys.argv[1] if len(sys.argv) > 1 else None
         bot = NewsBhaiBot(token)
         
-        async def start_bot():
-            """Async startup function"""
-            try:
-                # Run startup tasks
-                await bot.send_startup_test_message()
-                await bot.start_cache_cleaning()
-                
-                logger.info("Bot startup tasks completed")
-                
-            except Exception as e:
-                logger.error(f"Error in startup tasks: {e}")
-        
-        # Create event loop and run startup tasks
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Schedule startup tasks
-        loop.create_task(start_bot())
-        
-        # Start the bot (this will block)
+        # Start the bot (this will block); startup tasks run from post_init on the bot's own loop
         bot.run()
         
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Failed to start bot: {e}")
+        logger.error("Failed to start bot: %s", e)
         print(f"Error: {e}")
         print("\nMake sure you have:")
         print("1. Created a .env file with TELEGRAM_BOT_TOKEN")
         print("2. Installed all dependencies: pip install -r requirements.txt")
-        print("3. Set up your database properly")
-    finally:
-        # Clean up lock file
-        try:
-            os.unlink(lock_file)
-        except:
-            pass
\ No newline at end of file
+        print("3. Set up your database properly")
\ No newline at end of file
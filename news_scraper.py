@@ -1,126 +1,251 @@
 import asyncio
+import heapq
 import logging
+import math
 import re
 import random
-from typing import List, Dict, Optional
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, NamedTuple, Optional
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
 # Remove Twitter/X scraping dependency
 # import snscrape.modules.twitter as sntwitter  # REMOVED
-import requests
-from bs4 import BeautifulSoup
+from io import BytesIO
+import aiohttp
+import numpy as np
+from lxml import etree, html as lxml_html
+
+try:
+    import aiodns  # noqa: F401
+except ImportError:  # Optional; aiohttp falls back to resolving DNS in a thread pool
+    aiodns = None
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import instead of on every call
+WORD_RE = re.compile(r'\b\w+\b')
+
+def _tag_test(tags) -> str:
+    """XPath predicate matching any of the tags"""
+    return ' or '.join(f'self::{tag}' for tag in tags)
+
+def _class_xpath(prefix: str, tags, words) -> str:
+    """XPath for the tags whose class attribute contains any of the words, case-insensitively"""
+    lowered_class = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+    class_test = ' or '.join(f"contains({lowered_class}, '{word}')" for word in words)
+    return f'{prefix}*[{_tag_test(tags)}][{class_test}]'
+
+# Current affairs page structure, evaluated by lxml in C rather than walking a BeautifulSoup tree
+ARTICLE_XPATH = etree.XPath(_class_xpath('//', ('article', 'div'), ('story', 'news-item', 'article', 'headline')))
+HEADLINE_XPATH = etree.XPath(f"({_class_xpath('.//', ('h1', 'h2', 'h3', 'a'), ('headline', 'title'))})[1]")
+ANY_HEADLINE_XPATH = etree.XPath(f"(.//*[{_tag_test(('h1', 'h2', 'h3', 'a'))}])[1]")
+LINK_XPATH = etree.XPath('(.//a)[1]')
+CONTENT_XPATH = etree.XPath(f"({_class_xpath('.//', ('p', 'div'), ('summary', 'content', 'description'))})[1]")
+
+# Words ignored when pulling keywords out of a user's query
+STOP_WORDS = frozenset({
+    'what', 'how', 'when', 'where', 'why', 'who', 'is', 'are', 'was', 'were', 'the', 'a', 'an', 'and', 'or', 'but',
+    'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'about', 'kya', 'hai', 'hua', 'bhai', 'news', 'update'
+})
+
+@lru_cache(maxsize=2048)
+def parse_rss_date(date_str: str) -> Optional[datetime]:
+    """Parse an RSS/ISO date string to an aware datetime, cached since feeds repeat the same stamps"""
+    if not date_str:
+        return None
+    try:
+        # RFC 822 dates, the RSS standard, in a single call
+        parsed_date = parsedate_to_datetime(date_str)
+    except (TypeError, ValueError):
+        try:
+            parsed_date = datetime.fromisoformat(date_str)
+        except ValueError:
+            return None
+    
+    # If the datetime is naive (no timezone), make it timezone-aware
+    if parsed_date.tzinfo is None:
+        parsed_date = parsed_date.replace(tzinfo=timezone.utc)
+    return parsed_date
+
+# Items a topic scrape waits for; feeds still loading after that finish in the background
+TOPIC_ITEMS_TARGET = 32
+
+# BM25 term-frequency saturation and document-length normalisation for search ranking
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Candidate count from which BM25 is scored with NumPy arrays instead of a Python loop
+BM25_VECTOR_MIN_DOCS = 32
+
+# Readable names for feed domains
+SOURCE_NAMES = MappingProxyType({
+    'timesofindia.indiatimes.com': 'Times of India',
+    'ndtv.com': 'NDTV',
+    'hindustantimes.com': 'Hindustan Times',
+    'indiatoday.in': 'India Today',
+    'news18.com': 'News18',
+    'thehindu.com': 'The Hindu',
+    'indianexpress.com': 'Indian Express',
+    'economictimes.indiatimes.com': 'Economic Times',
+    'livemint.com': 'Live Mint',
+    'moneycontrol.com': 'MoneyControl',
+    'business-standard.com': 'Business Standard',
+    'reuters.com': 'Reuters',
+    'bbc.com': 'BBC',
+    'cnn.com': 'CNN',
+    'aljazeera.com': 'Al Jazeera'
+})
+
+@lru_cache(maxsize=64)
+def extract_source_name(feed_url: str) -> str:
+    """Extract a clean source name from a feed URL, cached since there are only a few dozen feeds"""
+    try:
+        # scheme://host[:port]/path -> host
+        domain = feed_url.split('/', 3)[2].split(':')[0]
+    except IndexError:
+        return 'RSS Feed'
+    
+    # Clean up common domain patterns
+    domain = domain.removeprefix('www.').removeprefix('feeds.')
+    return SOURCE_NAMES.get(domain) or domain.title()
+
+# How long one topic's scraped feeds are reused before scraping again
+TOPIC_CACHE_TTL = 30  # seconds
+
+# How long a single feed's parsed items are reused before asking the site again
+FEED_CACHE_TTL = 120  # seconds
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Sent with every scraper request via the session; feeds and HTML pages share it
+REQUEST_HEADERS = MappingProxyType({
+    'User-Agent': USER_AGENT,
+    'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, text/html;q=0.9, */*;q=0.8'
+})
+
+# Expanded RSS feeds for better fallback coverage; shared, read-only config
+RSS_FEEDS = MappingProxyType({
+    'general': (
+        'https://feeds.feedburner.com/ndtvnews-top-stories',
+        'https://timesofindia.indiatimes.com/rssfeedstopstories.cms',
+        'https://www.hindustantimes.com/feeds/rss/news/latest.xml',
+        'https://www.indiatoday.in/rss/home',
+        'https://www.news18.com/rss/india.xml',
+        'https://www.thehindu.com/news/feeder/default.rss',
+        'https://indianexpress.com/feed/'
+    ),
+    'politics': (
+        'https://timesofindia.indiatimes.com/rssfeeds/1898055.cms',
+        'https://www.thehindu.com/news/national/feeder/default.rss',
+        'https://www.indiatoday.in/rss/1206514',
+        'https://www.news18.com/rss/politics.xml',
+        'https://indianexpress.com/section/india/feed/'
+    ),
+    'technology': (
+        'https://economictimes.indiatimes.com/tech/rss/feedsdefault.cms',
+        'https://www.theverge.com/rss/index.xml',
+        'https://www.digit.in/feed',
+        'https://gadgets.ndtv.com/rss/feeds',
+        'https://techcrunch.com/feed/',
+        'https://www.wired.com/feed/rss'
+    ),
+    'sports': (
+        'https://timesofindia.indiatimes.com/rssfeeds/4719148.cms',
+        'https://www.espn.in/espn/rss/cricket/news',
+        'https://sports.ndtv.com/rss/all',
+        'https://www.sportskeeda.com/feed',
+        'https://indianexpress.com/section/sports/feed/'
+    ),
+    'finance': (
+        'https://economictimes.indiatimes.com/markets/rss/rssfeeds.cms',
+        'https://www.livemint.com/rss/markets',
+        'https://www.moneycontrol.com/rss/latestnews.xml',
+        'https://www.business-standard.com/rss/markets-106.rss',
+        'https://www.reuters.com/business/finance/rss'
+    ),
+    'entertainment': (
+        'https://timesofindia.indiatimes.com/rssfeeds/1081479906.cms',
+        'https://www.bollywoodhungama.com/rss/bollywood-news.xml',
+        'https://www.bollywoodhungama.com/rss/news',
+        'https://indianexpress.com/section/entertainment/feed/',
+        'https://www.hindustantimes.com/entertainment/feed'
+    ),
+    'health': (
+        'https://timesofindia.indiatimes.com/rssfeeds/3908999.cms',
+        'https://health.economictimes.indiatimes.com/rss',
+        'https://www.healthline.com/nutrition/feed',
+        'https://www.who.int/india/rss',
+        'https://indianexpress.com/section/lifestyle/health/feed/'
+    ),
+    'international': (
+        'https://timesofindia.indiatimes.com/rssfeeds/296589292.cms',
+        'https://www.bbc.com/news/world/asia/india/rss.xml',
+        'https://rss.cnn.com/rss/edition_world.rss',
+        'https://feeds.feedburner.com/ndtvnews-world-news',
+        'https://www.reuters.com/world/rss',
+        'https://www.aljazeera.com/xml/rss/all.xml'
+    ),
+    'business': (
+        'https://economictimes.indiatimes.com/industry/rss/industry.cms',
+        'https://www.livemint.com/rss/companies',
+        'https://www.business-standard.com/rss/companies-101.rss',
+        'https://www.moneycontrol.com/rss/business.xml',
+        'https://www.reuters.com/business/rss'
+    )
+})
+
+class NewsItem(NamedTuple):
+    """One scraped story; a tuple internally, handed to callers as a dict"""
+    title: str
+    content: str
+    source: str
+    url: str
+    timestamp: datetime
+    topic: str
+
 class NewsScraper:
-    # Add more RSS feeds for better fallback coverage
     def __init__(self):
-        # Flag to control if scraping should happen automatically
-        self.auto_scrape_enabled = False
-        
-        # Popular Indian news handles on X (formerly Twitter)
-        self.news_handles = {
-            'general': ['ANI', 'ndtv', 'timesofindia', 'IndianExpress', 'htTweets'],
-            'politics': ['ANI', 'ndtv', 'IndianExpress', 'republic', 'aajtak'],
-            'technology': ['ETtech', 'YourStory', 'Inc42', 'Medianama', 'trak_in'],
-            'sports': ['ESPNcricinfo', 'cricbuzz', 'KhelNow', 'IndiaToday_SPO'],
-            'finance': ['ETMarkets', 'BloombergQuint', 'moneycontrolcom', 'livemint'],
-            'entertainment': ['filmfare', 'BollywoodHungama', 'PinkvillaNews', 'ETimes'],
-            'health': ['MoHFW_INDIA', 'WHO', 'timesofindia', 'ndtv'],
-            'international': ['BBCWorld', 'Reuters', 'CNN', 'AlJazeera'],
-            'business': ['ETNow', 'CNBCTV18News', 'BloombergQuint', 'BusinessLine']
-        }
-        
-        # Expanded RSS feeds for better fallback coverage
-        self.rss_feeds = {
-            'general': [
-                'https://feeds.feedburner.com/ndtvnews-top-stories',
-                'https://timesofindia.indiatimes.com/rssfeedstopstories.cms',
-                'https://www.hindustantimes.com/feeds/rss/news/latest.xml',
-                'https://www.indiatoday.in/rss/home',
-                'https://www.news18.com/rss/india.xml',
-                'https://www.thehindu.com/news/feeder/default.rss',
-                'https://indianexpress.com/feed/'
-            ],
-            'politics': [
-                'https://timesofindia.indiatimes.com/rssfeeds/1898055.cms',
-                'https://www.thehindu.com/news/national/feeder/default.rss',
-                'https://www.indiatoday.in/rss/1206514',
-                'https://www.news18.com/rss/politics.xml',
-                'https://indianexpress.com/section/india/feed/'
-            ],
-            'technology': [
-                'https://economictimes.indiatimes.com/tech/rss/feedsdefault.cms',
-                'https://www.theverge.com/rss/index.xml',
-                'https://www.digit.in/feed',
-                'https://gadgets.ndtv.com/rss/feeds',
-                'https://techcrunch.com/feed/',
-                'https://www.wired.com/feed/rss'
-            ],
-            'sports': [
-                'https://timesofindia.indiatimes.com/rssfeeds/4719148.cms',
-                'https://www.espn.in/espn/rss/cricket/news',
-                'https://sports.ndtv.com/rss/all',
-                'https://www.sportskeeda.com/feed',
-                'https://indianexpress.com/section/sports/feed/'
-            ],
-            'finance': [
-                'https://economictimes.indiatimes.com/markets/rss/rssfeeds.cms',
-                'https://www.livemint.com/rss/markets',
-                'https://www.moneycontrol.com/rss/latestnews.xml',
-                'https://www.business-standard.com/rss/markets-106.rss',
-                'https://www.reuters.com/business/finance/rss'
-            ],
-            'entertainment': [
-                'https://timesofindia.indiatimes.com/rssfeeds/1081479906.cms',
-                'https://www.bollywoodhungama.com/rss/bollywood-news.xml',
-                'https://www.bollywoodhungama.com/rss/news',
-                'https://indianexpress.com/section/entertainment/feed/',
-                'https://www.hindustantimes.com/entertainment/feed'
-            ],
-            'health': [
-                'https://timesofindia.indiatimes.com/rssfeeds/3908999.cms',
-                'https://health.economictimes.indiatimes.com/rss',
-                'https://www.healthline.com/nutrition/feed',
-                'https://www.who.int/india/rss',
-                'https://indianexpress.com/section/lifestyle/health/feed/'
-            ],
-            'international': [
-                'https://timesofindia.indiatimes.com/rssfeeds/296589292.cms',
-                'https://www.bbc.com/news/world/asia/india/rss.xml',
-                'https://rss.cnn.com/rss/edition_world.rss',
-                'https://feeds.feedburner.com/ndtvnews-world-news',
-                'https://www.reuters.com/world/rss',
-                'https://www.aljazeera.com/xml/rss/all.xml'
-            ],
-            'business': [
-                'https://economictimes.indiatimes.com/industry/rss/industry.cms',
-                'https://www.livemint.com/rss/companies',
-                'https://www.business-standard.com/rss/companies-101.rss',
-                'https://www.moneycontrol.com/rss/business.xml',
-                'https://www.reuters.com/business/rss'
-            ]
-        }
-    
-    # Enable or disable auto scraping
-    def set_auto_scrape(self, enabled: bool):
-        self.auto_scrape_enabled = enabled
-        logger.info(f"Auto scraping set to: {enabled}")
+        # Cap on topics scraped at the same time so we don't flood the feeds
+        self.fetch_semaphore = asyncio.Semaphore(8)
+        
+        # Recent per-topic feed scrapes as (start time, task), shared across concurrent queries
+        self.topic_cache: Dict[str, tuple] = {}
+        
+        # Parsed items per (feed URL, topic) as (fetch time, ETag, Last-Modified, items), for conditional GETs
+        self.feed_cache: Dict[tuple, tuple] = {}
+        # One fetch per feed at a time so concurrent misses don't all download and parse it
+        self.feed_locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Slow feed fetches left running to fill the feed cache; referenced so they aren't garbage collected
+        self.background_fetches = set()
+        
+        # Shared HTTP session, created on first use inside the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
     
     async def get_latest_news(self, topics: List[str], limit: int = 10) -> List[Dict]:
         """Get latest news for specified topics"""
         all_news = []
         
-        for topic in topics:
-            try:
-                topic_news = await self._scrape_topic_news(topic, limit // len(topics))
-                all_news.extend(topic_news)
-            except Exception as e:
-                logger.error(f"Error scraping {topic} news: {e}")
+        # Fetch all topics at once instead of one round trip after another
+        per_topic = max(1, limit // max(1, len(topics)))
+        results = await asyncio.gather(
+            *(self._scrape_topic_news_bounded(topic, per_topic) for topic in topics),
+            return_exceptions=True
+        )
+        
+        for topic, topic_news in zip(topics, results):
+            if isinstance(topic_news, Exception):
+                logger.error("Error scraping %s news: %s", topic, topic_news)
                 continue
+            all_news.extend(topic_news)
+        
+        # The same story can come in under more than one topic
+        all_news = self._dedupe_news(all_news)
         
-        # Sort by timestamp and return most recent - fix datetime comparison
-        all_news.sort(key=lambda x: x.get('timestamp', datetime.now(timezone.utc)), reverse=True)
-        return all_news[:limit]
+        # Return most recent; nlargest only keeps `limit` items instead of sorting everything
+        latest = heapq.nlargest(limit, all_news, key=lambda x: x.timestamp)
+        return [item._asdict() for item in latest]
     
     async def search_news(self, query: str, topics: List[str], limit: int = 5) -> List[Dict]:
         """Search for news related to a specific query"""
@@ -129,120 +254,261 @@ class NewsScraper:
         # Extract keywords from query
         keywords = self._extract_keywords(query)
         
-        for topic in topics:
-            try:
-                # Search in recent tweets from news handles
-                topic_results = await self._search_topic_with_keywords(topic, keywords, limit)
-                search_results.extend(topic_results)
-            except Exception as e:
-                logger.error(f"Error searching {topic} with query '{query}': {e}")
+        # Search all topics at once
+        results = await asyncio.gather(
+            *(self._search_topic_with_keywords(topic, keywords, limit) for topic in topics),
+            return_exceptions=True
+        )
+        
+        for topic, topic_results in zip(topics, results):
+            if isinstance(topic_results, Exception):
+                logger.error("Error searching %s with query '%s': %s", topic, query, topic_results)
                 continue
+            search_results.extend(topic_results)
+        
+        # Topics share stories, so drop repeats before they crowd the top results
+        search_results = self._dedupe_news(search_results)
         
         # Filter and rank results by relevance
-        relevant_results = self._rank_by_relevance(search_results, keywords)
-        return relevant_results[:limit]
+        return self._rank_by_relevance(search_results, keywords, limit)
     
-    async def _scrape_topic_news(self, topic: str, limit: int) -> List[Dict]:
+    async def _search_topic_with_keywords(self, topic: str, keywords: List[str], limit: int) -> List[NewsItem]:
+        """Find a topic's recent news mentioning any of the keywords"""
+        if topic == 'current_affairs':
+            news_items = await self._scrape_current_affairs_items(limit)
+        else:
+            news_items = await self._get_topic_feed_news(topic)
+        
+        matches = []
+        for item in news_items:
+            text = f"{item.title} {item.content}".lower()
+            if any(keyword in text for keyword in keywords):
+                matches.append(item)
+        return matches
+    
+    async def _scrape_topic_news_bounded(self, topic: str, limit: int) -> List[NewsItem]:
+        """Scrape a topic while keeping the number of concurrent topic fetches capped"""
+        async with self.fetch_semaphore:
+            return await self._scrape_topic_news(topic, limit)
+    
+    async def _scrape_topic_news(self, topic: str, limit: int) -> List[NewsItem]:
         """Scrape news for a specific topic using RSS feeds only"""
         # Special handling for current affairs
         if topic == 'current_affairs':
-            return await self.scrape_current_affairs(limit)
+            return await self._scrape_current_affairs_items(limit)
             
         news_items = []
         
         # Use RSS feeds directly - no more Twitter/X scraping
-        logger.info(f"Scraping RSS feeds for topic: {topic}")
-        rss_news = await self._scrape_rss_feed(topic)
+        logger.debug("Scraping RSS feeds for topic: %s", topic)
+        rss_news = await self._get_topic_feed_news(topic)
         news_items.extend(rss_news)
         
-        # Sort by timestamp and limit results - fix datetime comparison
-        news_items.sort(key=lambda x: x.get('timestamp', datetime.now(timezone.utc)), reverse=True)
-        return news_items[:limit]
+        # Most recent first, limited to `limit` items
+        return heapq.nlargest(limit, news_items, key=lambda x: x.timestamp)
+    
+    async def _get_topic_feed_news(self, topic: str) -> List[NewsItem]:
+        """Scrape a topic's feeds, sharing one scrape between all callers within TOPIC_CACHE_TTL"""
+        now = time.monotonic()
+        entry = self.topic_cache.get(topic)
+        if entry is None or now - entry[0] >= TOPIC_CACHE_TTL:
+            # Drop expired topics, then start a scrape that concurrent callers can join
+            for stale_topic in [t for t, (started, _) in self.topic_cache.items() if now - started >= TOPIC_CACHE_TTL]:
+                del self.topic_cache[stale_topic]
+            
+            task = asyncio.create_task(self._scrape_topic_feeds(topic))
+            task.add_done_callback(lambda t: self._forget_failed_scrape(topic, t))
+            entry = self.topic_cache[topic] = (now, task)
+        
+        # Shield so one caller giving up doesn't cancel the scrape for everyone else
+        return await asyncio.shield(entry[1])
+    
+    def _forget_failed_scrape(self, topic: str, task: asyncio.Task):
+        """Drop a failed scrape from the topic cache so the next caller retries right away"""
+        if task.cancelled() or task.exception() is not None:
+            entry = self.topic_cache.get(topic)
+            if entry and entry[1] is task:
+                del self.topic_cache[topic]
+    
+    async def _scrape_topic_feeds(self, topic: str) -> List[NewsItem]:
+        """Scrape all feeds for a topic"""
+        rss_news = await self._scrape_rss_feed(topic)
+        # Feeds for a topic overlap, so drop repeated stories before taking the top few
+        return self._dedupe_news(rss_news)
+    
+    def _dedupe_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
+        """Keep the first item for each story, matched by URL or by case-insensitive title"""
+        seen = set()
+        unique_items = []
+        for item in news_items:
+            title_key = item.title.lower()
+            if title_key in seen or (item.url and item.url in seen):
+                continue
+            seen.add(title_key)
+            if item.url:
+                seen.add(item.url)
+            unique_items.append(item)
+        return unique_items
     
     # REMOVED: _get_tweets_from_handle method - no longer needed
     
-    async def _scrape_rss_feed(self, topic: str) -> List[Dict]:
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use so keep-alive connections are reused"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                # Keep connections and DNS lookups around between scrapes; a few warm connections per site
+                # (several topics share hosts) instead of a burst of new TLS handshakes
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=4, ttl_dns_cache=300, keepalive_timeout=75,
+                    enable_cleanup_closed=True,
+                    resolver=aiohttp.AsyncResolver() if aiodns else None
+                ),
+                timeout=aiohttp.ClientTimeout(total=15, connect=5, sock_read=10),
+                # Add user agent to avoid blocking
+                headers=REQUEST_HEADERS
+            )
+        return self.session
+    
+    async def warmup(self):
+        """Connect to every feed host ahead of time so the first scrape skips DNS and TLS setup"""
+        session = await self._get_session()
+        hosts = {feed_url.split('/', 3)[2] for feeds in RSS_FEEDS.values() for feed_url in feeds}
+        await asyncio.gather(*(self._warm_host(session, host) for host in hosts), return_exceptions=True)
+        logger.debug("Warmed connections to %d feed hosts", len(hosts))
+    
+    async def _warm_host(self, session: aiohttp.ClientSession, host: str):
+        """Send a cheap request to a host, leaving a resolved address and open connection behind"""
+        async with session.head(f'https://{host}/', allow_redirects=False):
+            pass
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        for task in self.background_fetches:
+            task.cancel()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+    
+    async def __aenter__(self) -> 'NewsScraper':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _scrape_rss_feed(self, topic: str) -> List[NewsItem]:
         """Enhanced RSS feed scraping with better error handling"""
+        feeds = RSS_FEEDS.get(topic, RSS_FEEDS['general'])
+        
+        # Fetch every feed at once and take them as they arrive
+        tasks = {asyncio.create_task(self._fetch_rss_feed(feed_url, topic)): feed_url for feed_url in feeds}
+        pending = set(tasks)
         news_items = []
-        feeds = self.rss_feeds.get(topic, self.rss_feeds['general'])
+        try:
+            # Stop waiting once there are enough items instead of on the slowest feed
+            while pending and len(news_items) < TOPIC_ITEMS_TARGET:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # A feed task cancelled on its own must not cancel the whole scrape
+                    if task.cancelled():
+                        logger.error("RSS feed fetch was cancelled: %s", tasks[task])
+                        continue
+                    error = task.exception()
+                    if error is not None:
+                        logger.error("Error scraping RSS feed %s: %s", tasks[task], error)
+                        continue
+                    news_items.extend(task.result())
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
         
-        for feed_url in feeds:
-            try:
-                # Add user agent to avoid blocking
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                
-                response = requests.get(feed_url, timeout=15, headers=headers)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'xml')
-                
-                items = soup.find_all('item')[:8]  # Get more items per feed
-                
-                for item in items:
-                    title = item.find('title')
-                    description = item.find('description')
-                    link = item.find('link')
-                    pub_date = item.find('pubDate')
-                    
-                    if title and description:
-                        # Clean up description text
-                        desc_text = description.text.strip()
-                        if len(desc_text) > 300:
-                            desc_text = desc_text[:300] + "..."
-                        
-                        # Extract domain name for source
-                        source_name = self._extract_source_name(feed_url)
-                        
-                        news_items.append({
-                            'title': title.text.strip(),
-                            'content': desc_text,
-                            'source': source_name,
-                            'url': link.text.strip() if link else '',
-                            'timestamp': self._parse_rss_date(pub_date.text) if pub_date else datetime.now(timezone.utc),
-                            'topic': topic
-                        })
-                
-                logger.info(f"Successfully scraped {len(items)} items from {source_name}")
-                
-            except Exception as e:
-                logger.error(f"Error scraping RSS feed {feed_url}: {e}")
-                continue
+        # Stragglers keep going; their items land in the feed cache for the next scrape
+        for task in pending:
+            self.background_fetches.add(task)
+            task.add_done_callback(self._finish_background_fetch)
         
         return news_items
     
-    def _extract_source_name(self, feed_url: str) -> str:
-        """Extract a clean source name from RSS feed URL"""
-        try:
-            from urllib.parse import urlparse
-            domain = urlparse(feed_url).netloc
+    def _finish_background_fetch(self, task: asyncio.Task):
+        """Forget a finished background feed fetch, logging its failure"""
+        self.background_fetches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Background feed fetch failed: %s", task.exception())
+    
+    async def _fetch_rss_feed(self, feed_url: str, topic: str) -> List[NewsItem]:
+        """Fetch and parse a single RSS feed, reusing recent results for FEED_CACHE_TTL"""
+        # Items carry their topic, and unknown topics share the general feeds, so key on both
+        key = (feed_url, topic)
+        async with self.feed_locks[key]:
+            entry = self.feed_cache.get(key)
+            if entry and time.monotonic() - entry[0] < FEED_CACHE_TTL:
+                return entry[3]
             
-            # Clean up common domain patterns
-            domain = domain.replace('www.', '').replace('feeds.', '')
+            # Ask the site whether the feed changed since our copy
+            headers = {}
+            if entry and entry[1]:
+                headers['If-None-Match'] = entry[1]
+            if entry and entry[2]:
+                headers['If-Modified-Since'] = entry[2]
             
-            # Map to readable names
-            source_map = {
-                'timesofindia.indiatimes.com': 'Times of India',
-                'ndtv.com': 'NDTV',
-                'hindustantimes.com': 'Hindustan Times',
-                'indiatoday.in': 'India Today',
-                'news18.com': 'News18',
-                'thehindu.com': 'The Hindu',
-                'indianexpress.com': 'Indian Express',
-                'economictimes.indiatimes.com': 'Economic Times',
-                'livemint.com': 'Live Mint',
-                'moneycontrol.com': 'MoneyControl',
-                'business-standard.com': 'Business Standard',
-                'reuters.com': 'Reuters',
-                'bbc.com': 'BBC',
-                'cnn.com': 'CNN',
-                'aljazeera.com': 'Al Jazeera'
-            }
+            session = await self._get_session()
+            async with session.get(feed_url, headers=headers) as response:
+                if response.status == 304 and entry:
+                    # Unchanged: keep the items we already parsed for another TTL
+                    self.feed_cache[key] = (time.monotonic(), *entry[1:])
+                    return entry[3]
+                response.raise_for_status()
+                content = await response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
             
-            return source_map.get(domain, domain.title())
-        except:
-            return 'RSS Feed'
+            # Parsing is CPU work; keep it off the event loop so other fetches keep moving
+            news_items = await asyncio.to_thread(self._parse_rss_items, content, feed_url, topic)
+            self.feed_cache[key] = (time.monotonic(), etag, last_modified, news_items)
+            return news_items
+    
+    def _parse_rss_items(self, content: bytes, feed_url: str, topic: str) -> List[NewsItem]:
+        """Parse the first few items of an RSS or Atom feed"""
+        # Extract domain name for source
+        source_name = extract_source_name(feed_url)
+        
+        news_items = []
+        parsed = 0
+        # One timestamp for items without a usable date, instead of a datetime.now() per item
+        fetched_at = datetime.now(timezone.utc)
+        # Stream <item> (RSS) / <entry> (Atom) elements instead of building a tree for the whole feed
+        for _, item in etree.iterparse(BytesIO(content), events=('end',), tag=('{*}item', '{*}entry'), recover=True):
+            title = item.findtext('{*}title')
+            description = item.findtext('{*}description') or item.findtext('{*}summary') or item.findtext('{*}content')
+            link = item.findtext('{*}link')
+            if not link:
+                # Atom puts the URL in an attribute: <link href="..."/>
+                link_elem = item.find('{*}link')
+                link = link_elem.get('href') if link_elem is not None else ''
+            pub_date = item.findtext('{*}pubDate') or item.findtext('{*}published') or item.findtext('{*}updated')
+            
+            if title and description:
+                # Clean up description text
+                desc_text = description.strip()
+                if len(desc_text) > 300:
+                    desc_text = desc_text[:300] + "..."
+                
+                news_items.append(NewsItem(
+                    title=title.strip(),
+                    content=desc_text,
+                    source=source_name,
+                    url=link.strip() if link else '',
+                    timestamp=(pub_date and parse_rss_date(pub_date.strip())) or fetched_at,
+                    topic=topic
+                ))
+            
+            # Release the parsed item; we only ever need a handful of them
+            item.clear()
+            parsed += 1
+            if parsed >= 8:  # Get more items per feed
+                break
+        
+        logger.debug("Successfully scraped %d items from %s", parsed, source_name)
+        return news_items
     
     # Remove Twitter-specific methods
     # def _is_news_tweet(self, content: str) -> bool:  # REMOVED
@@ -251,71 +517,150 @@ class NewsScraper:
     def _extract_keywords(self, query: str) -> List[str]:
         """Extract keywords from user query"""
         # Remove common words and extract meaningful keywords
-        stop_words = {'what', 'how', 'when', 'where', 'why', 'who', 'is', 'are', 'was', 'were', 'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'about', 'kya', 'hai', 'hua', 'bhai', 'news', 'update'}
+        keywords = []
+        for match in WORD_RE.finditer(query.lower()):
+            word = match.group()
+            if len(word) > 2 and word not in STOP_WORDS:
+                keywords.append(word)
+                if len(keywords) == 5:  # Limit to 5 most relevant keywords
+                    break
+        
+        return keywords
+    
+    def _bm25_scores(self, documents: List[Counter], keywords: List[str]) -> List[float]:
+        """BM25 score of each tokenized document, with IDF taken over the documents themselves"""
+        doc_count = len(documents)
+        if doc_count >= BM25_VECTOR_MIN_DOCS:
+            return self._bm25_scores_vectorized(documents, keywords)
         
-        words = re.findall(r'\b\w+\b', query.lower())
-        keywords = [word for word in words if word not in stop_words and len(word) > 2]
+        lengths = [sum(tokens.values()) for tokens in documents]
+        avg_length = sum(lengths) / doc_count or 1
+        
+        idf = {}
+        for keyword in dict.fromkeys(keywords):
+            doc_freq = sum(1 for tokens in documents if keyword in tokens)
+            idf[keyword] = math.log((doc_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+        
+        scores = []
+        for tokens, length in zip(documents, lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            score = 0.0
+            for keyword, weight in idf.items():
+                freq = tokens.get(keyword)
+                if freq:
+                    score += weight * freq * (BM25_K1 + 1) / (freq + norm)
+            scores.append(score)
+        return scores
+    
+    def _bm25_scores_vectorized(self, documents: List[Counter], keywords: List[str]) -> List[float]:
+        """BM25 over a documents x keywords term-frequency matrix, for large candidate sets"""
+        terms = list(dict.fromkeys(keywords))
+        doc_count = len(documents)
+        tf = np.array([[tokens.get(term, 0) for term in terms] for tokens in documents], dtype=np.float64).reshape(doc_count, len(terms))
+        lengths = np.fromiter((sum(tokens.values()) for tokens in documents), dtype=np.float64, count=doc_count)
+        avg_length = lengths.mean() or 1
         
-        return keywords[:5]  # Limit to 5 most relevant keywords
+        doc_freq = np.count_nonzero(tf, axis=0)
+        idf = np.log((doc_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+        scores = (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+        return scores.tolist()
     
-    def _calculate_relevance(self, content: str, keywords: List[str]) -> float:
-        """Calculate relevance score based on keyword matches"""
-        content_lower = content.lower()
-        score = 0
+    def _rank_by_relevance(self, results: List[NewsItem], keywords: List[str], limit: int) -> List[Dict]:
+        """Return the top results by BM25 relevance to search keywords"""
+        if not results:
+            return []
         
-        for keyword in keywords:
-            if keyword in content_lower:
-                score += 1
-                # Bonus for exact word match
-                if f' {keyword} ' in f' {content_lower} ':
-                    score += 0.5
+        # Tokenize each result once; term counts feed both IDF and TF
+        documents = [Counter(WORD_RE.findall(f"{result.title} {result.content}".lower())) for result in results]
+        scores = self._bm25_scores(documents, keywords)
         
-        return score / len(keywords) if keywords else 0
+        # Highest relevance score first, then most recent
+        ranked = heapq.nlargest(limit, zip(scores, results), key=lambda x: (x[0], x[1].timestamp))
+        return [{**result._asdict(), 'relevance_score': score} for score, result in ranked]
     
-    def _rank_by_relevance(self, results: List[Dict], keywords: List[str]) -> List[Dict]:
-        """Rank results by relevance to search keywords"""
-        for result in results:
-            if 'relevance_score' not in result:
-                result['relevance_score'] = self._calculate_relevance(result['content'], keywords)
+    async def _scrape_current_affairs_source(self, source_url: str, limit: int) -> List[NewsItem]:
+        """Scrape headlines from one current affairs page"""
+        session = await self._get_session()
+        # Fetch the raw bytes; text() would run charset detection over the whole page when the header has none
+        async with session.get(source_url) as response:
+            content = await response.read()
+            charset = response.charset
         
-        # Sort by relevance score, then by timestamp
-        results.sort(key=lambda x: (x.get('relevance_score', 0), x.get('timestamp', datetime.min)), reverse=True)
-        return results
+        # Parsing is CPU work; keep it off the event loop so other fetches keep moving
+        return await asyncio.to_thread(self._parse_current_affairs, content, charset, source_url, limit)
     
-    def _parse_rss_date(self, date_str: str) -> datetime:
-        """Parse RSS date string to datetime object with timezone handling"""
-        try:
-            # Try common RSS date formats
-            formats = [
-                '%a, %d %b %Y %H:%M:%S %z',
-                '%a, %d %b %Y %H:%M:%S GMT',
-                '%Y-%m-%dT%H:%M:%S%z',
-                '%Y-%m-%d %H:%M:%S'
-            ]
+    def _parse_current_affairs(self, page: bytes, charset: Optional[str], source_url: str, limit: int) -> List[NewsItem]:
+        """Extract headlines from a current affairs page"""
+        # Decode in lxml: the Content-Type charset if given, otherwise the page's <meta charset>
+        tree = lxml_html.fromstring(page, parser=lxml_html.HTMLParser(encoding=charset))
+        
+        # Extract headlines based on common patterns in news websites
+        headlines = []
+        seen_titles = set()
+        fetched_at = datetime.now(timezone.utc)
+        source = source_url.split('/')[2]
+        
+        # Look for article elements with headlines
+        for article in ARTICLE_XPATH(tree):
+            # Find headline element
+            headline_elems = HEADLINE_XPATH(article) or ANY_HEADLINE_XPATH(article)
+            if not headline_elems:
+                continue
+            headline_elem = headline_elems[0]
+            
+            # Extract title and link
+            title = headline_elem.text_content().strip()
+            # Nested matches repeat their parent's headline; skip them before any more lookups
+            if len(title) <= 10 or title in seen_titles:
+                continue
             
-            for fmt in formats:
-                try:
-                    parsed_date = datetime.strptime(date_str.strip(), fmt)
-                    # If the datetime is naive (no timezone), make it timezone-aware
-                    if parsed_date.tzinfo is None:
-                        parsed_date = parsed_date.replace(tzinfo=timezone.utc)
-                    return parsed_date
-                except ValueError:
+            # Get the article URL
+            if headline_elem.tag == 'a' and headline_elem.get('href') is not None:
+                link = self._absolute_url(headline_elem.get('href'), source_url)
+            else:
+                link_elems = LINK_XPATH(article)
+                if not (link_elems and link_elems[0].get('href') is not None):
                     continue
+                link = self._absolute_url(link_elems[0].get('href'), source_url)
+            
+            # Extract content snippet if available
+            content = ''
+            content_elems = CONTENT_XPATH(article)
+            if content_elems:
+                content = content_elems[0].text_content().strip()
+            
+            seen_titles.add(title)
+            headlines.append(NewsItem(
+                title=title,
+                content=content if content else title,
+                source=source,
+                url=link,
+                timestamp=fetched_at,
+                topic='current_affairs'
+            ))
             
-            # Return timezone-aware datetime for consistency
-            return datetime.now(timezone.utc)
-        except Exception:
-            return datetime.now(timezone.utc)
+            if len(headlines) >= limit:
+                break
+        
+        return headlines
+    
+    def _absolute_url(self, link: str, source_url: str) -> str:
+        """Resolve a link scraped from source_url to an absolute URL"""
+        if link.startswith('http'):
+            return link
+        # Handle relative URLs
+        if link.startswith('/'):
+            base_url = '/'.join(source_url.split('/')[:3])
+            return base_url + link
+        return source_url + '/' + link
     
     async def scrape_current_affairs(self, limit: int = 5) -> List[Dict]:
         """Scrape current affairs news from reliable sources"""
-        # Make sure to use async libraries for HTTP requests
-        # For example, use aiohttp instead of requests
-        
-        # Example modification:
-        import aiohttp
-        
+        return [item._asdict() for item in await self._scrape_current_affairs_items(limit)]
+    
+    async def _scrape_current_affairs_items(self, limit: int) -> List[NewsItem]:
+        """Scrape current affairs headlines from all sources"""
         news_items = []
         
         # List of reliable current affairs sources
@@ -325,89 +670,16 @@ class NewsScraper:
             'https://www.hindustantimes.com/india-news'
         ]
         
-        async with aiohttp.ClientSession() as session:
-            for source_url in current_affairs_sources:
-                try:
-                    # Fetch the webpage content
-                    async with session.get(source_url, timeout=10, 
-                                      headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}) as response:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Extract headlines based on common patterns in news websites
-                        headlines = []
-                        
-                        # Look for article elements with headlines
-                        for article in soup.find_all(['article', 'div'], class_=re.compile(r'(story|news-item|article|headline)', re.I)):
-                            # Find headline element
-                            headline_elem = article.find(['h1', 'h2', 'h3', 'a'], class_=re.compile(r'(headline|title)', re.I))
-                            if not headline_elem:
-                                headline_elem = article.find(['h1', 'h2', 'h3', 'a'])
-                            
-                            if headline_elem:
-                                # Extract title and link
-                                title = headline_elem.get_text().strip()
-                                link = ''
-                                
-                                # Get the article URL
-                                if headline_elem.name == 'a' and headline_elem.has_attr('href'):
-                                    link = headline_elem['href']
-                                    if not link.startswith('http'):
-                                        # Handle relative URLs
-                                        if link.startswith('/'):
-                                            base_url = '/'.join(source_url.split('/')[:3])
-                                            link = base_url + link
-                                        else:
-                                            link = source_url + '/' + link
-                                else:
-                                    link_elem = article.find('a')
-                                    if link_elem and link_elem.has_attr('href'):
-                                        link = link_elem['href']
-                                        if not link.startswith('http'):
-                                            # Handle relative URLs
-                                            if link.startswith('/'):
-                                                base_url = '/'.join(source_url.split('/')[:3])
-                                                link = base_url + link
-                                            else:
-                                                link = source_url + '/' + link
-                                        
-                                        # Extract content snippet if available
-                                        content = ''
-                                        content_elem = article.find(['p', 'div'], class_=re.compile(r'(summary|content|description)', re.I))
-                                        if content_elem:
-                                            content = content_elem.get_text().strip()
-                                        
-                                        if title and len(title) > 10 and not any(h['title'] == title for h in headlines):
-                                            headlines.append({
-                                                'title': title,
-                                                'content': content if content else title,
-                                                'url': link,
-                                                'source': source_url.split('/')[2],
-                                                'timestamp': datetime.now(timezone.utc)
-                                            })
-                                            
-                                            if len(headlines) >= limit:
-                                                break
-                                    
-                                news_items.extend(headlines)
-                                
-                                # If we have enough news items, stop scraping more sources
-                                if len(news_items) >= limit:
-                                    break
-                                    
-                except Exception as e:
-                    logger.error(f"Error scraping current affairs from {source_url}: {e}")
-        
-        # Format the news items to match the expected structure
-        formatted_news = []
-        for item in news_items[:limit]:
-            formatted_news.append({
-                'title': item['title'],
-                'content': item['content'],
-                'source': item['source'],
-                'url': item['url'],
-                'timestamp': item['timestamp'],
-                'topic': 'current_affairs'
-            })
-        
-        return formatted_news
\ No newline at end of file
+        # Fetch all sources at once over the shared session
+        results = await asyncio.gather(
+            *(self._scrape_current_affairs_source(source_url, limit) for source_url in current_affairs_sources),
+            return_exceptions=True
+        )
+        
+        for source_url, headlines in zip(current_affairs_sources, results):
+            if isinstance(headlines, Exception):
+                logger.error("Error scraping current affairs from %s: %s", source_url, headlines)
+                continue
+            news_items.extend(headlines)
+        
+        return news_items[:limit]
\ No newline at end of file
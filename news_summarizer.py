@@ -1,92 +1,253 @@
+import gc
+import os
+import asyncio
 import logging
 import re
 import random
+import importlib.util
+import threading
 from typing import List, Dict, Optional
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM, BitsAndBytesConfig
 import torch
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import instead of on every call
+LINK_AND_TAG_RE = re.compile(r'http\S+|www\S+|@\w+|#\w+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Greedy decoding with a tight cap on new tokens; sampling and long outputs dominated summary latency
+SUMMARY_GENERATION = {
+    'do_sample': False,
+    'num_beams': 1,
+    'no_repeat_ngram_size': 3,
+    'max_new_tokens': 80,
+    'min_length': 30
+}
+
+# Summarization models: distilled English BART by default, multilingual mBART for Hindi
+ENGLISH_SUMMARY_MODEL = "sshleifer/distilbart-cnn-12-6"
+MULTILINGUAL_SUMMARY_MODEL = "facebook/mbart-large-50-many-to-many-mmt"
+FALLBACK_SUMMARY_MODEL = "facebook/bart-large-cnn"
+
+# Where ONNX exports of the summarization model are kept between runs (CPU only)
+ONNX_MODEL_DIR = "onnx_models"
+ONNX_MODEL_FILES = ('encoder_model.onnx', 'decoder_model.onnx', 'decoder_with_past_model.onnx')
+
+# Emoji and localized name per topic
+TOPIC_INFO = {
+    'politics': {'emoji': '🏛️', 'hindi': 'राजनीति', 'english': 'Politics', 'hinglish': 'Politics'},
+    'technology': {'emoji': '💻', 'hindi': 'तकनीक', 'english': 'Technology', 'hinglish': 'Technology'},
+    'sports': {'emoji': '⚽', 'hindi': 'खेल', 'english': 'Sports', 'hinglish': 'Sports'},
+    'finance': {'emoji': '💰', 'hindi': 'वित्त', 'english': 'Finance', 'hinglish': 'Finance'},
+    'entertainment': {'emoji': '🎬', 'hindi': 'मनोरंजन', 'english': 'Entertainment', 'hinglish': 'Entertainment'},
+    'health': {'emoji': '🏥', 'hindi': 'स्वास्थ्य', 'english': 'Health', 'hinglish': 'Health'},
+    'international': {'emoji': '🌍', 'hindi': 'अंतर्राष्ट्रीय', 'english': 'International', 'hinglish': 'International'},
+    'business': {'emoji': '🏢', 'hindi': 'व्यापार', 'english': 'Business', 'hinglish': 'Business'},
+    'general': {'emoji': '📰', 'hindi': 'सामान्य', 'english': 'General', 'hinglish': 'General'}
+}
+
+# Sign-offs and empty-result messages, built once instead of on every call
+CASUAL_ENDINGS = {
+    'hindi': (
+        "बस यही था आज का अपडेट! 👍",
+        "और कुछ चाहिए तो बताना भाई! 😊",
+        "हो गया आज का न्यूज़! 📰"
+    ),
+    'english': (
+        "That's your update for today! 👍",
+        "Let me know if you need anything else, bro! 😊",
+        "That's all for now! 📰"
+    ),
+    'hinglish': (
+        "Bass yahi tha aaj ka update! 👍",
+        "Aur kuch chahiye toh batana bhai! 😊",
+        "Ho gaya aaj ka news! 📰"
+    )
+}
+
+NO_NEWS_MESSAGES = {
+    'hindi': "अरे भाई, अभी कोई खास खबर नहीं मिली। थोड़ी देर बाद ट्राई करना! 😅",
+    'english': "Hey bro, couldn't find any news right now. Try again later! 😅",
+    'hinglish': "Arre bhai, abhi koi khaas news nahi mili. Thodi der baad try karna! 😅"
+}
+
 class NewsSummarizer:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.summarizer = None
-        self.tokenizer = None
-        self.model = None
+        # Summarization pipelines by model name, loaded on first use (None if loading failed)
+        self.summarizers: Dict[str, Optional[object]] = {}
+        # Held while a model loads so two worker threads never load the same one
+        self.load_lock = threading.Lock()
         self._load_models()
         
         # Casual phrases for different languages
         self.casual_intros = {
-            'hindi': [
+            'hindi': (
                 "अरे भाई, आज की खबर सुनो -",
                 "भाई पता है आज क्या हुआ?",
                 "सुनो भाई, ये हुआ है आज -",
                 "अरे यार, आज की बड़ी खबर ये है -"
-            ],
-            'english': [
+            ),
+            'english': (
                 "Hey bro, here's what happened today -",
                 "Bhai, you know what's going on?",
                 "Listen up, here's the latest -",
                 "Yo, big news today -"
-            ],
-            'hinglish': [
+            ),
+            'hinglish': (
                 "Arre bhai, aaj ki news sun -",
                 "Bhai pata hai aaj kya hua?",
                 "Sun yaar, aaj ka update -",
                 "Arre, aaj ki badi news ye hai -"
-            ]
+            )
         }
         
         self.casual_connectors = {
-            'hindi': ["और फिर", "इसके बाद", "अब बात ये है", "और सुनो"],
-            'english': ["And then", "Also", "Plus", "Oh and"],
-            'hinglish': ["Aur phir", "Aur sun", "Plus yaar", "Arre aur"]
+            'hindi': ("और फिर", "इसके बाद", "अब बात ये है", "और सुनो"),
+            'english': ("And then", "Also", "Plus", "Oh and"),
+            'hinglish': ("Aur phir", "Aur sun", "Plus yaar", "Arre aur")
         }
     
     def _load_models(self):
-        """Load summarization models"""
+        """Load the default summarization model; the Hindi one loads when first needed"""
+        self._get_summarizer('english')
+    
+    def _get_summarizer(self, language: str):
+        """Get the summarization pipeline for a language, loading its model on first use"""
+        # Distilled BART is ~2x faster and English/Hinglish news is English text; mBART only for Hindi
+        model_name = MULTILINGUAL_SUMMARY_MODEL if language == 'hindi' else ENGLISH_SUMMARY_MODEL
+        if model_name not in self.summarizers:
+            with self.load_lock:
+                if model_name not in self.summarizers:
+                    self.summarizers[model_name] = self._load_summarizer(model_name)
+        return self.summarizers[model_name]
+    
+    def _load_summarizer(self, model_name: str):
+        """Load a summarization pipeline, falling back to the English-only model"""
         try:
-            # Try to load multilingual model first
-            model_name = "facebook/mbart-large-50-many-to-many-mmt"
-            
-            logger.info(f"Loading summarization model: {model_name}")
-            
-            # Load tokenizer and model
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            
-            # Create pipeline
-            self.summarizer = pipeline(
-                "summarization",
-                model=self.model,
-                tokenizer=self.tokenizer,
-                device=0 if self.device == "cuda" else -1,
-                max_length=150,
-                min_length=30,
-                do_sample=True,
-                temperature=0.7
-            )
-            
+            logger.info("Loading summarization model: %s", model_name)
+            summarizer = self._build_pipeline(model_name)
             logger.info("Summarization model loaded successfully")
-            
+            return summarizer
         except Exception as e:
-            logger.error(f"Error loading multilingual model, trying fallback: {e}")
+            logger.error("Error loading %s, trying fallback: %s", model_name, e)
+            # Release whatever the failed load allocated before loading another model
+            gc.collect()
+            if self.device == "cuda":
+                torch.cuda.empty_cache()
+        
+        if FALLBACK_SUMMARY_MODEL not in self.summarizers:
             try:
-                # Fallback to English-only model
-                model_name = "facebook/bart-large-cnn"
-                self.summarizer = pipeline(
-                    "summarization",
-                    model=model_name,
-                    device=0 if self.device == "cuda" else -1,
-                    max_length=150,
-                    min_length=30,
-                    do_sample=True,
-                    temperature=0.7
-                )
+                # Fallback to English-only model, loaded the same way (quantized / half precision)
+                self.summarizers[FALLBACK_SUMMARY_MODEL] = self._build_pipeline(FALLBACK_SUMMARY_MODEL)
                 logger.info("Fallback summarization model loaded")
             except Exception as e2:
-                logger.error(f"Failed to load any summarization model: {e2}")
-                self.summarizer = None
+                logger.error("Failed to load any summarization model: %s", e2)
+                self.summarizers[FALLBACK_SUMMARY_MODEL] = None
+        return self.summarizers[FALLBACK_SUMMARY_MODEL]
+    
+    def _build_pipeline(self, model_name: str):
+        """Load a model and its tokenizer once and wrap them in a summarization pipeline"""
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model, device_kwargs = self._load_summary_model(model_name)
+        # The pipeline holds the only references, so nothing keeps a second copy alive
+        summarizer = pipeline(
+            "summarization",
+            model=model,
+            tokenizer=tokenizer,
+            **SUMMARY_GENERATION,
+            **device_kwargs
+        )
+        self._warm_up(summarizer)
+        return summarizer
+    
+    def _warm_up(self, summarizer):
+        """Run a tiny generation so kernel setup happens at load time, not on the first user request"""
+        try:
+            summarizer("Warmup text for the summarization model.", max_new_tokens=8, min_length=0)
+        except Exception as e:
+            logger.warning("Summarizer warmup failed: %s", e)
+    
+    def _load_summary_model(self, model_name: str):
+        """Load the model with int8 weights where possible; returns it with the pipeline's device arguments"""
+        # Decoding is bound by reading weights, so smaller weights mean faster tokens
+        if self.device == "cuda" and importlib.util.find_spec("bitsandbytes"):
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                model_name,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True, llm_int8_threshold=6.0),
+                device_map="auto"
+            )
+            # Already placed by accelerate; the pipeline must not move it
+            return model, {}
+        
+        if self.device == "cpu":
+            # ONNX Runtime's int8 GEMMs beat eager PyTorch on CPU
+            onnx_model = self._load_onnx_model(model_name)
+            if onnx_model is not None:
+                return onnx_model, {}
+        
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name, torch_dtype=self._model_dtype(), low_cpu_mem_usage=True
+        )
+        if self.device == "cuda":
+            return self._fuse_attention(model), {'device': 0}
+        
+        # CPU: int8 weights for the Linear layers with PyTorch's built-in dynamic quantization
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model, {'device': -1}
+    
+    def _load_onnx_model(self, model_name: str):
+        """Load an int8-quantized ONNX Runtime copy of the model, exporting it on first use; None if unavailable"""
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        except ImportError:
+            return None
+        
+        export_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace('/', '--'))
+        quantized_dir = f"{export_dir}-int8"
+        try:
+            if not os.path.isdir(quantized_dir):
+                logger.info("Exporting %s to ONNX (first run only)...", model_name)
+                ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+                
+                # Quantize into a scratch directory so an interrupted run never leaves a half-written model
+                scratch_dir = f"{quantized_dir}.tmp"
+                qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                for file_name in ONNX_MODEL_FILES:
+                    quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+                    quantizer.quantize(save_dir=scratch_dir, quantization_config=qconfig)
+                os.replace(scratch_dir, quantized_dir)
+            
+            encoder, decoder, decoder_with_past = (name.replace('.onnx', '_quantized.onnx') for name in ONNX_MODEL_FILES)
+            return ORTModelForSeq2SeqLM.from_pretrained(
+                quantized_dir,
+                encoder_file_name=encoder,
+                decoder_file_name=decoder,
+                decoder_with_past_file_name=decoder_with_past
+            )
+        except Exception as e:
+            logger.warning("ONNX Runtime model unavailable, using PyTorch: %s", e)
+            return None
+    
+    def _fuse_attention(self, model):
+        """Swap in fused attention kernels via optimum's BetterTransformer, when it's installed"""
+        try:
+            from optimum.bettertransformer import BetterTransformer
+        except ImportError:
+            return model
+        
+        try:
+            return BetterTransformer.transform(model, keep_original_model=False)
+        except Exception as e:
+            logger.warning("BetterTransformer not applied, using eager attention: %s", e)
+            return model
+    
+    def _model_dtype(self) -> torch.dtype:
+        """Weight precision for the summarization model: fp16 on GPU, fp32 on CPU"""
+        # CPU kernels for half precision are slow or missing on most machines, so stay in fp32 there
+        return torch.float16 if self.device == "cuda" else torch.float32
     
     async def summarize_news(self, news_data: List[Dict], language: str, query: str = "") -> str:
         """Summarize news data into a casual, friend-like response"""
@@ -94,11 +255,11 @@ class NewsSummarizer:
             return self._get_no_news_message(language)
         
         try:
-            # Combine and clean news content
-            combined_text = self._prepare_text_for_summarization(news_data)
+            # Combine and clean news content; tokenizing may load the model first, so keep it off the event loop
+            combined_text = await asyncio.to_thread(self._prepare_text_for_summarization, news_data, language)
             
             # Generate summary
-            if self.summarizer:
+            if self._get_summarizer(language):
                 summary = await self._generate_ai_summary(combined_text, language)
             else:
                 summary = self._generate_fallback_summary(news_data, language)
@@ -109,7 +270,7 @@ class NewsSummarizer:
             return casual_summary
             
         except Exception as e:
-            logger.error(f"Error summarizing news: {e}")
+            logger.error("Error summarizing news: %s", e)
             return self._generate_fallback_summary(news_data, language)
     
     async def create_news_digest(self, news_items: List[Dict], language: str = 'english', max_length: int = 300) -> str:
@@ -177,26 +338,34 @@ class NewsSummarizer:
             return "\n\n".join(digest_parts)
             
         except Exception as e:
-            logger.error(f"Error creating news digest: {e}")
+            logger.error("Error creating news digest: %s", e)
             return self._generate_fallback_summary(news_data, language)
     
-    def _prepare_text_for_summarization(self, news_data: List[Dict]) -> str:
+    def _prepare_text_for_summarization(self, news_data: List[Dict], language: str = 'english') -> str:
         """Prepare and clean text for summarization"""
         texts = []
         
         for item in news_data[:5]:  # Limit to 5 items to avoid token limits
             content = item.get('content', '')
             # Clean the text
-            clean_content = re.sub(r'http\S+|www\S+|@\w+|#\w+', '', content)
-            clean_content = re.sub(r'\s+', ' ', clean_content).strip()
+            clean_content = LINK_AND_TAG_RE.sub('', content)
+            clean_content = WHITESPACE_RE.sub(' ', clean_content).strip()
             
             if len(clean_content) > 50:  # Only include substantial content
                 texts.append(clean_content)
         
         combined = ' '.join(texts)
         
-        # Truncate if too long (BART has token limits)
-        if len(combined) > 1000:
+        summarizer = self._get_summarizer(language)
+        tokenizer = summarizer.tokenizer if summarizer else None
+        if tokenizer is not None:
+            # Truncate to the encoder's window in tokens; Devanagari text makes character counts a poor guide
+            max_tokens = min(tokenizer.model_max_length, 1024) - 8
+            token_ids = tokenizer.encode(combined, truncation=True, max_length=max_tokens)
+            if len(token_ids) >= max_tokens:
+                combined = tokenizer.decode(token_ids, skip_special_tokens=True)
+        elif len(combined) > 1000:
+            # Truncate if too long (BART has token limits)
             combined = combined[:1000] + "..."
         
         return combined
@@ -204,18 +373,22 @@ class NewsSummarizer:
     async def _generate_ai_summary(self, text: str, language: str) -> str:
         """Generate AI-powered summary"""
         try:
-            # Generate summary using the model
-            result = self.summarizer(text, max_length=130, min_length=30, do_sample=True)
-            summary = result[0]['summary_text']
+            # Generate summary using the model on a worker thread, loading it there if needed
+            summary = await asyncio.to_thread(self._run_summarizer, text, language)
             
             return summary
             
         except Exception as e:
-            logger.error(f"Error generating AI summary: {e}")
+            logger.error("Error generating AI summary: %s", e)
             # Return first few sentences as fallback
             sentences = text.split('.')[:3]
             return '. '.join(sentences) + '.'
     
+    def _run_summarizer(self, text: str, language: str) -> str:
+        """Summarize text with the language's model (blocking)"""
+        result = self._get_summarizer(language)(text, truncation=True)
+        return result[0]['summary_text']
+    
     def _generate_fallback_summary(self, news_data: List[Dict], language: str) -> str:
         """Generate a simple summary when AI models fail"""
         summaries = []
@@ -286,37 +459,31 @@ class NewsSummarizer:
         # Get topic emoji and name
         topic_info = self._get_topic_info(topic, language)
         
+        # Tokenizing, loading the model and generating all block, so they run on a worker thread
+        topic_summary = await asyncio.to_thread(self._summarize_topic_items, items, language)
+        
+        return f"{topic_info['emoji']} **{topic_info['name']}**: {topic_summary}"
+    
+    def _summarize_topic_items(self, items: List[Dict], language: str) -> str:
+        """Summarize one topic's items with the model (blocking)"""
         # Combine content from this topic
-        topic_content = self._prepare_text_for_summarization(items)
+        topic_content = self._prepare_text_for_summarization(items, language)
         
         # Generate summary for this topic
-        if self.summarizer and len(topic_content) > 100:
+        summarizer = self._get_summarizer(language)
+        if summarizer and len(topic_content) > 100:
             try:
-                result = self.summarizer(topic_content, max_length=80, min_length=20)
-                topic_summary = result[0]['summary_text']
+                result = summarizer(topic_content, max_new_tokens=60, min_length=20, truncation=True)
+                return result[0]['summary_text']
             except:
-                # Fallback to first item's content
-                topic_summary = items[0].get('title', items[0].get('content', '')[:100])
-        else:
-            topic_summary = items[0].get('title', items[0].get('content', '')[:100])
+                pass
         
-        return f"{topic_info['emoji']} **{topic_info['name']}**: {topic_summary}"
+        # Fallback to first item's content
+        return items[0].get('title', items[0].get('content', '')[:100])
     
     def _get_topic_info(self, topic: str, language: str) -> Dict[str, str]:
         """Get topic emoji and localized name"""
-        topic_map = {
-            'politics': {'emoji': '🏛️', 'hindi': 'राजनीति', 'english': 'Politics', 'hinglish': 'Politics'},
-            'technology': {'emoji': '💻', 'hindi': 'तकनीक', 'english': 'Technology', 'hinglish': 'Technology'},
-            'sports': {'emoji': '⚽', 'hindi': 'खेल', 'english': 'Sports', 'hinglish': 'Sports'},
-            'finance': {'emoji': '💰', 'hindi': 'वित्त', 'english': 'Finance', 'hinglish': 'Finance'},
-            'entertainment': {'emoji': '🎬', 'hindi': 'मनोरंजन', 'english': 'Entertainment', 'hinglish': 'Entertainment'},
-            'health': {'emoji': '🏥', 'hindi': 'स्वास्थ्य', 'english': 'Health', 'hinglish': 'Health'},
-            'international': {'emoji': '🌍', 'hindi': 'अंतर्राष्ट्रीय', 'english': 'International', 'hinglish': 'International'},
-            'business': {'emoji': '🏢', 'hindi': 'व्यापार', 'english': 'Business', 'hinglish': 'Business'},
-            'general': {'emoji': '📰', 'hindi': 'सामान्य', 'english': 'General', 'hinglish': 'General'}
-        }
-        
-        info = topic_map.get(topic, topic_map['general'])
+        info = TOPIC_INFO.get(topic, TOPIC_INFO['general'])
         return {
             'emoji': info['emoji'],
             'name': info.get(language, info['english'])
@@ -324,32 +491,8 @@ class NewsSummarizer:
     
     def _get_casual_ending(self, language: str) -> str:
         """Get a casual ending for the summary"""
-        endings = {
-            'hindi': [
-                "बस यही था आज का अपडेट! 👍",
-                "और कुछ चाहिए तो बताना भाई! 😊",
-                "हो गया आज का न्यूज़! 📰"
-            ],
-            'english': [
-                "That's your update for today! 👍",
-                "Let me know if you need anything else, bro! 😊",
-                "That's all for now! 📰"
-            ],
-            'hinglish': [
-                "Bass yahi tha aaj ka update! 👍",
-                "Aur kuch chahiye toh batana bhai! 😊",
-                "Ho gaya aaj ka news! 📰"
-            ]
-        }
-        
-        return random.choice(endings.get(language, endings['english']))
+        return random.choice(CASUAL_ENDINGS.get(language, CASUAL_ENDINGS['english']))
     
     def _get_no_news_message(self, language: str) -> str:
         """Get message when no news is available"""
-        messages = {
-            'hindi': "अरे भाई, अभी कोई खास खबर नहीं मिली। थोड़ी देर बाद ट्राई करना! 😅",
-            'english': "Hey bro, couldn't find any news right now. Try again later! 😅",
-            'hinglish': "Arre bhai, abhi koi khaas news nahi mili. Thodi der baad try karna! 😅"
-        }
-        
-        return messages.get(language, messages['english'])
\ No newline at end of file
+        return NO_NEWS_MESSAGES.get(language, NO_NEWS_MESSAGES['english'])
\ No newline at end of file
@@ -1,179 +1,249 @@
 import asyncio
+import heapq
 import logging
-import schedule
-import time
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
-import threading
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from bot import NewsBhaiBot
 
 logger = logging.getLogger(__name__)
 
+# Users sent to at once during a scheduled run; the bot's rate limiter keeps Telegram's limits
+SCHEDULED_SEND_CONCURRENCY = 25
+
+# Greetings per update type, built once instead of on every call
+MORNING_GREETINGS = {
+    'hindi': "🌅 सुप्रभात! आज की ताज़ा खबरें:",
+    'english': "🌅 Good morning! Here's your daily news update:",
+    'hinglish': "🌅 Good morning bhai! Aaj ki fresh news:"
+}
+
+EVENING_GREETINGS = {
+    'hindi': "🌆 शुभ संध्या! आज की शाम की खबरें:",
+    'english': "🌆 Good evening! Here's your evening news update:",
+    'hinglish': "🌆 Good evening bhai! Shaam ki news:"
+}
+
+WEEKLY_GREETINGS = {
+    'hindi': "📅 सप्ताहिक समाचार सारांश:",
+    'english': "📅 Your weekly news digest:",
+    'hinglish': "📅 Weekly news digest, bhai:"
+}
+
+GENERAL_GREETINGS = {
+    'hindi': "📰 समाचार अपडेट:",
+    'english': "📰 News Update:",
+    'hinglish': "📰 News update, bhai:"
+}
+
 class NewsScheduler:
     def __init__(self, bot_instance):
         self.bot = bot_instance
-        self.scheduler_thread = None
+        self.scheduler_task = None
         self.running = False
+        self.job_tasks = set()
+        
+        # Scheduled jobs as (hour, minute, weekday, job); weekday None means every day, 0 is Monday
+        self.jobs = [
+            (8, 0, None, self._send_daily_news),
+            (18, 0, None, self._send_evening_news),
+            (9, 0, 0, self._send_weekly_news)
+        ]
     
     def start(self):
-        """Start the news scheduler"""
+        """Start the news scheduler on the running event loop"""
         if self.running:
             return
         
         self.running = True
-        
-        # Schedule different frequency updates
-        schedule.every().day.at("08:00").do(self._send_daily_news)
-        schedule.every().day.at("18:00").do(self._send_evening_news)
-        schedule.every().monday.at("09:00").do(self._send_weekly_news)
-        
-        # Start scheduler in a separate thread
-        self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self.scheduler_thread.start()
+        self.scheduler_task = asyncio.create_task(self._run_scheduler())
         
         logger.info("News scheduler started")
     
-    def stop(self):
-        """Stop the news scheduler"""
+    async def stop(self, timeout: float = 5):
+        """Stop the news scheduler, cancelling any sends still in flight"""
         self.running = False
-        schedule.clear()
+        tasks = [task for task in (self.scheduler_task, *self.job_tasks) if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        
+        if tasks:
+            # Give cancelled sends a moment to unwind so nothing is left pending at exit
+            await asyncio.wait(tasks, timeout=timeout)
         logger.info("News scheduler stopped")
     
-    def _run_scheduler(self):
-        """Run the scheduler loop"""
+    def _next_run_time(self, hour: int, minute: int, weekday: Optional[int], after: datetime) -> datetime:
+        """Get the first run time strictly after the given time"""
+        run_time = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is not None:
+            run_time += timedelta(days=(weekday - after.weekday()) % 7)
+        if run_time <= after:
+            run_time += timedelta(days=7 if weekday is not None else 1)
+        return run_time
+    
+    async def _run_scheduler(self):
+        """Sleep until the next due job instead of polling, then run it"""
+        now = datetime.now()
+        queue = [
+            (self._next_run_time(hour, minute, weekday, now), index)
+            for index, (hour, minute, weekday, _) in enumerate(self.jobs)
+        ]
+        heapq.heapify(queue)
+        
         while self.running:
             try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                run_time, index = queue[0]
+                delay = (run_time - datetime.now()).total_seconds()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                hour, minute, weekday, job = self.jobs[index]
+                task = asyncio.create_task(job())
+                # Keep a reference so the task isn't garbage collected mid-run
+                self.job_tasks.add(task)
+                task.add_done_callback(self.job_tasks.discard)
+                
+                heapq.heapreplace(queue, (self._next_run_time(hour, minute, weekday, run_time), index))
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                logger.error(f"Error in scheduler: {e}")
-                time.sleep(60)
+                logger.error("Error in scheduler: %s", e)
+                await asyncio.sleep(60)
     
-    def _send_daily_news(self):
+    async def _send_daily_news(self):
         """Send daily news to users"""
         try:
-            users = self.bot.user_prefs.get_all_users_by_frequency('daily')
-            asyncio.create_task(self._send_news_to_users(users, 'daily'))
+            users = self.bot.user_prefs.get_preferences_by_frequency('daily')
+            await self._send_news_to_users(users, 'daily')
         except Exception as e:
-            logger.error(f"Error sending daily news: {e}")
+            logger.error("Error sending daily news: %s", e)
     
-    def _send_evening_news(self):
+    async def _send_evening_news(self):
         """Send evening news to users with twice daily frequency"""
         try:
-            users = self.bot.user_prefs.get_all_users_by_frequency('twice_daily')
-            asyncio.create_task(self._send_news_to_users(users, 'evening'))
+            users = self.bot.user_prefs.get_preferences_by_frequency('twice_daily')
+            await self._send_news_to_users(users, 'evening')
         except Exception as e:
-            logger.error(f"Error sending evening news: {e}")
+            logger.error("Error sending evening news: %s", e)
     
-    def _send_weekly_news(self):
+    async def _send_weekly_news(self):
         """Send weekly news digest"""
         try:
-            users = self.bot.user_prefs.get_all_users_by_frequency('weekly')
-            asyncio.create_task(self._send_news_to_users(users, 'weekly'))
+            users = self.bot.user_prefs.get_preferences_by_frequency('weekly')
+            await self._send_news_to_users(users, 'weekly')
         except Exception as e:
-            logger.error(f"Error sending weekly news: {e}")
+            logger.error("Error sending weekly news: %s", e)
     
-    async def _send_news_to_users(self, user_ids: list, update_type: str):
-        """Send news updates to a list of users"""
-        for user_id in user_ids:
-            try:
-                await self._send_scheduled_news(user_id, update_type)
-                # Add delay to avoid rate limiting
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.error(f"Error sending news to user {user_id}: {e}")
-    
-    async def _send_scheduled_news(self, user_id: int, update_type: str):
-        """Send scheduled news to a specific user"""
-        try:
-            # Get user preferences
-            prefs = self.bot.user_prefs.get_user_preferences(user_id)
+    async def _send_news_to_users(self, users: dict, update_type: str):
+        """Send news updates to users, given as a mapping of user ID to preferences"""
+        # Users with the same language and topics get the same update, so build it once per group
+        groups = defaultdict(list)
+        for user_id, prefs in users.items():
             language = prefs.get('language', 'english')
             topics = prefs.get('topics', ['general'])
+            groups[(language, tuple(sorted(set(topics))))].append(user_id)
+        
+        semaphore = asyncio.Semaphore(SCHEDULED_SEND_CONCURRENCY)
+        
+        async def send_all(batch: list, send_one, payload):
+            async def send(user_id: int):
+                async with semaphore:
+                    await send_one(user_id, payload)
             
-            # Get news based on update type
-            if update_type == 'weekly':
-                news_data = await self.bot.news_scraper.get_latest_news(topics, limit=15)
-            else:
-                news_data = await self.bot.news_scraper.get_latest_news(topics, limit=8)
-            
-            if not news_data:
+            # Send concurrently instead of one user per second; AIORateLimiter paces the actual API calls
+            results = await asyncio.gather(*(send(user_id) for user_id in batch), return_exceptions=True)
+            for user_id, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error("Error sending news to user %s: %s", user_id, result)
+        
+        async def send_group(language: str, topics: tuple, group_user_ids: list):
+            try:
+                update = await self._build_scheduled_update(list(topics), language, update_type)
+            except Exception as e:
+                logger.error("Error building %s news for %s %s: %s", update_type, language, topics, e)
+                return
+            if update is None:
                 return
             
-            # Create appropriate message based on update type
-            if update_type == 'daily':
-                greeting = self._get_morning_greeting(language)
-            elif update_type == 'evening':
-                greeting = self._get_evening_greeting(language)
-            elif update_type == 'weekly':
-                greeting = self._get_weekly_greeting(language)
-            else:
-                greeting = self._get_general_greeting(language)
-            
-            # Generate summary
-            if update_type == 'weekly':
-                summary = await self.bot.summarizer.create_news_digest(news_data, language)
-            else:
-                summary = await self.bot.summarizer.create_news_digest(news_data, language)
-            
-            # Send text message
-            full_message = f"{greeting}\n\n{summary}"
-            
-            await self.bot.application.bot.send_message(
-                chat_id=user_id,
-                text=full_message,
-                parse_mode='Markdown'
-            )
-            
-            # Generate and send voice note
-            voice_path = await self.bot.tts_handler.generate_voice_note(summary, language)
-            if voice_path and os.path.exists(voice_path):
-                with open(voice_path, 'rb') as voice_file:
-                    await self.bot.application.bot.send_voice(
-                        chat_id=user_id,
-                        voice=voice_file
-                    )
-                os.remove(voice_path)
+            full_message, summary = update
+            # One voice note per group, through the bot's on-disk voice cache; TTS runs while the text goes out
+            voice_task = asyncio.create_task(self.bot.get_voice_note(summary, language))
+            try:
+                await send_all(group_user_ids, self._send_scheduled_text, full_message)
+            except asyncio.CancelledError:
+                voice_task.cancel()
+                raise
             
-            logger.info(f"Sent {update_type} news to user {user_id}")
+            try:
+                voice_path = await voice_task
+            except Exception as e:
+                logger.error("Error generating %s voice note: %s", update_type, e)
+                return
+            if not voice_path:
+                return
             
-        except Exception as e:
-            logger.error(f"Error sending scheduled news to user {user_id}: {e}")
+            # The first send uploads the voice note; the rest reuse its Telegram file_id
+            await send_all(group_user_ids[:1], self._send_scheduled_voice, voice_path)
+            await send_all(group_user_ids[1:], self._send_scheduled_voice, voice_path)
+        
+        await asyncio.gather(*(
+            send_group(language, topics, group_user_ids)
+            for (language, topics), group_user_ids in groups.items()
+        ))
+    
+    async def _build_scheduled_update(self, topics: list, language: str, update_type: str) -> Optional[tuple]:
+        """Fetch and summarize scheduled news, returning (full message, summary) or None if there's no news"""
+        # Get news based on update type
+        if update_type == 'weekly':
+            news_data = await self.bot.news_scraper.get_latest_news(topics, limit=15)
+        else:
+            news_data = await self.bot.news_scraper.get_latest_news(topics, limit=8)
+        
+        if not news_data:
+            return None
+        
+        # Create appropriate message based on update type
+        if update_type == 'daily':
+            greeting = self._get_morning_greeting(language)
+        elif update_type == 'evening':
+            greeting = self._get_evening_greeting(language)
+        elif update_type == 'weekly':
+            greeting = self._get_weekly_greeting(language)
+        else:
+            greeting = self._get_general_greeting(language)
+        
+        # Generate summary
+        summary = await self.bot.summarizer.create_news_digest(news_data, language)
+        
+        return f"{greeting}\n\n{summary}", summary
+    
+    async def _send_scheduled_text(self, user_id: int, full_message: str):
+        """Send a scheduled update's text to a specific user"""
+        await self.bot.application.bot.send_message(
+            chat_id=user_id,
+            text=full_message,
+            parse_mode='Markdown'
+        )
+        logger.info("Sent scheduled news to user %s", user_id)
+    
+    async def _send_scheduled_voice(self, user_id: int, voice_path: str):
+        """Send a scheduled update's voice note to a specific user"""
+        await self.bot.send_voice_note(user_id, voice_path)
     
     def _get_morning_greeting(self, language: str) -> str:
         """Get morning greeting based on language"""
-        greetings = {
-            'hindi': "🌅 सुप्रभात! आज की ताज़ा खबरें:",
-            'english': "🌅 Good morning! Here's your daily news update:",
-            'hinglish': "🌅 Good morning bhai! Aaj ki fresh news:"
-        }
-        return greetings.get(language, greetings['english'])
+        return MORNING_GREETINGS.get(language, MORNING_GREETINGS['english'])
     
     def _get_evening_greeting(self, language: str) -> str:
         """Get evening greeting based on language"""
-        greetings = {
-            'hindi': "🌆 शुभ संध्या! आज की शाम की खबरें:",
-            'english': "🌆 Good evening! Here's your evening news update:",
-            'hinglish': "🌆 Good evening bhai! Shaam ki news:"
-        }
-        return greetings.get(language, greetings['english'])
+        return EVENING_GREETINGS.get(language, EVENING_GREETINGS['english'])
     
     def _get_weekly_greeting(self, language: str) -> str:
         """Get weekly greeting based on language"""
-        greetings = {
-            'hindi': "📅 सप्ताहिक समाचार सारांश:",
-            'english': "📅 Your weekly news digest:",
-            'hinglish': "📅 Weekly news digest, bhai:"
-        }
-        return greetings.get(language, greetings['english'])
+        return WEEKLY_GREETINGS.get(language, WEEKLY_GREETINGS['english'])
     
     def _get_general_greeting(self, language: str) -> str:
         """Get general greeting based on language"""
-        greetings = {
-            'hindi': "📰 समाचार अपडेट:",
-            'english': "📰 News Update:",
-            'hinglish': "📰 News update, bhai:"
-        }
-        return greetings.get(language, greetings['english'])
\ No newline at end of file
+        return GENERAL_GREETINGS.get(language, GENERAL_GREETINGS['english'])
\ No newline at end of file
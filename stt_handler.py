@@ -1,9 +1,10 @@
 import os
 import logging
 import asyncio
-import tempfile
-from typing import Optional
-import whisper
+from io import BytesIO
+from typing import Optional, Union
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
 import torch
 
 logger = logging.getLogger(__name__)
@@ -12,109 +13,105 @@ class STTHandler:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model = None
+        # Whisper runs in a worker thread; one transcription at a time on the shared model
+        self.model_lock = asyncio.Lock()
         self._load_whisper_model()
     
     def _load_whisper_model(self):
         """Load Whisper model for speech recognition"""
+        # CTranslate2 int8 kernels: several times faster than fp32 PyTorch with the same accuracy
+        compute_type = "int8_float16" if self.device == "cuda" else "int8"
         try:
             # Try to load a smaller model first for faster processing
             model_size = "base"  # Options: tiny, base, small, medium, large
             
-            logger.info(f"Loading Whisper {model_size} model...")
-            self.model = whisper.load_model(model_size, device=self.device)
+            logger.info("Loading Whisper %s model...", model_size)
+            self.model = WhisperModel(model_size, device=self.device, compute_type=compute_type)
             logger.info("Whisper model loaded successfully")
             
         except Exception as e:
-            logger.error(f"Error loading Whisper model: {e}")
+            logger.error("Error loading Whisper model: %s", e)
             try:
                 # Fallback to tiny model
                 logger.info("Trying to load tiny Whisper model as fallback...")
-                self.model = whisper.load_model("tiny", device=self.device)
+                self.model = WhisperModel("tiny", device=self.device, compute_type=compute_type)
                 logger.info("Fallback Whisper model loaded")
             except Exception as e2:
-                logger.error(f"Failed to load any Whisper model: {e2}")
+                logger.error("Failed to load any Whisper model: %s", e2)
                 self.model = None
+        
+        if self.model:
+            self._warm_up()
     
-    async def transcribe_audio(self, audio_path: str, language: str = None) -> Optional[str]:
-        """Transcribe audio file to text"""
+    def _warm_up(self):
+        """Transcribe a second of silence so kernel setup happens at load time, not on the first voice message"""
+        try:
+            segments, _ = self.model.transcribe(np.zeros(16000, dtype=np.float32), language="en", beam_size=1)
+            # Segments are lazy; iterating runs the decoder too
+            list(segments)
+        except Exception as e:
+            logger.warning("Whisper warmup failed: %s", e)
+    
+    async def transcribe_audio(self, audio: Union[str, bytes], language: str = None) -> Optional[str]:
+        """Transcribe an audio file path or in-memory audio bytes to text"""
         if not self.model:
             logger.error("Whisper model not available")
             return None
         
-        if not os.path.exists(audio_path):
-            logger.error(f"Audio file not found: {audio_path}")
-            return None
+        if isinstance(audio, (bytes, bytearray)):
+            audio_path = None
+        else:
+            audio_path = audio
+            if not os.path.exists(audio_path):
+                logger.error("Audio file not found: %s", audio_path)
+                return None
         
         try:
-            # Convert audio format if needed
-            processed_audio_path = await self._prepare_audio_for_whisper(audio_path)
-            
-            # Transcribe audio
-            logger.info(f"Transcribing audio: {processed_audio_path}")
+            if audio_path is None:
+                # Decode in memory, no temporary files on disk
+                processed_audio = await self._decode_audio_bytes(audio)
+                if processed_audio is None:
+                    return None
+                logger.debug("Transcribing %d bytes of in-memory audio", len(audio))
+            else:
+                # faster-whisper decodes any format itself with PyAV, so the path goes straight in
+                processed_audio = audio_path
+                logger.debug("Transcribing audio: %s", processed_audio)
             
             # Set language for better accuracy
             language_code = self._get_whisper_language_code(language) if language else None
             
-            result = self.model.transcribe(
-                processed_audio_path,
-                language=language_code,
-                task="transcribe",
-                fp16=False  # Use fp32 for better compatibility
-            )
-            
-            transcribed_text = result["text"].strip()
+            async with self.model_lock:
+                transcribed_text = await asyncio.to_thread(self._transcribe_blocking, processed_audio, language_code)
             
-            # Clean up temporary file if created
-            if processed_audio_path != audio_path and os.path.exists(processed_audio_path):
-                os.remove(processed_audio_path)
-            
-            logger.info(f"Transcription successful: {transcribed_text[:100]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Transcription successful: %s...", transcribed_text[:100])
             return transcribed_text
             
         except Exception as e:
-            logger.error(f"Error transcribing audio: {e}")
+            logger.error("Error transcribing audio: %s", e)
             return None
     
-    async def _prepare_audio_for_whisper(self, audio_path: str) -> str:
-        """Prepare audio file for Whisper processing"""
+    def _transcribe_blocking(self, audio: Union[str, np.ndarray], language_code: Optional[str]) -> str:
+        """Run Whisper transcription (blocking, called from a worker thread)"""
+        # Greedy decoding, and voice activity detection so silent stretches are never decoded
+        segments, _ = self.model.transcribe(
+            audio,
+            language=language_code,
+            task="transcribe",
+            beam_size=1,
+            vad_filter=True
+        )
+        # Segments are decoded lazily as they're iterated
+        return " ".join(segment.text.strip() for segment in segments).strip()
+    
+    async def _decode_audio_bytes(self, audio_bytes: bytes) -> Optional[np.ndarray]:
+        """Decode audio bytes to a 16kHz mono waveform in-process, without an ffmpeg subprocess"""
         try:
-            # Check if file is already in a supported format
-            supported_formats = ['.wav', '.mp3', '.m4a', '.flac']
-            file_ext = os.path.splitext(audio_path)[1].lower()
-            
-            if file_ext in supported_formats:
-                return audio_path
-            
-            # Convert to WAV format using ffmpeg
-            temp_dir = tempfile.gettempdir()
-            output_path = os.path.join(temp_dir, f"whisper_input_{os.getpid()}.wav")
-            
-            cmd = [
-                'ffmpeg', '-i', audio_path,
-                '-ar', '16000',  # Whisper prefers 16kHz
-                '-ac', '1',      # Mono
-                '-c:a', 'pcm_s16le',
-                '-y',            # Overwrite output
-                output_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0 and os.path.exists(output_path):
-                return output_path
-            else:
-                logger.warning(f"Audio conversion failed: {stderr.decode()}")
-                return audio_path  # Return original if conversion fails
-                
+            return await asyncio.to_thread(decode_audio, BytesIO(bytes(audio_bytes)), sampling_rate=16000)
         except Exception as e:
-            logger.warning(f"Could not prepare audio (ffmpeg not available?): {e}")
-            return audio_path
+            logger.error("Audio decoding failed: %s", e)
+            return None
     
     def _get_whisper_language_code(self, language: str) -> Optional[str]:
         """Convert our language codes to Whisper language codes"""
@@ -132,27 +129,27 @@ class STTHandler:
             return None
         
         try:
-            # Load audio and detect language
-            audio = whisper.load_audio(audio_path)
-            audio = whisper.pad_or_trim(audio)
+            async with self.model_lock:
+                probs = await asyncio.to_thread(self._detect_language_probs, audio_path)
             
-            # Make log-Mel spectrogram and move to the same device as the model
-            mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
-            
-            # Detect the spoken language
-            _, probs = self.model.detect_language(mel)
             detected_language = max(probs, key=probs.get)
             
-            logger.info(f"Detected language: {detected_language} (confidence: {probs[detected_language]:.2f})")
+            logger.debug("Detected language: %s (confidence: %.2f)", detected_language, probs[detected_language])
             
             # Map back to our language codes
             reverse_map = {'hi': 'hindi', 'en': 'english'}
             return reverse_map.get(detected_language, 'english')
             
         except Exception as e:
-            logger.error(f"Error detecting language: {e}")
+            logger.error("Error detecting language: %s", e)
             return None
     
+    def _detect_language_probs(self, audio_path: str) -> dict:
+        """Run Whisper language detection (blocking, called from a worker thread)"""
+        # Language is detected from the first 30 seconds up front; the segments are never iterated, so nothing is decoded
+        _, info = self.model.transcribe(audio_path)
+        return {info.language: info.language_probability}
+    
     def is_available(self) -> bool:
         """Check if STT is available"""
         return self.model is not None
\ No newline at end of file
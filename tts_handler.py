@@ -1,19 +1,75 @@
+import gc
 import os
 import logging
 import asyncio
+import re
+import threading
 from typing import Optional
+import numpy as np
 import torch
 from TTS.api import TTS
 import tempfile
 import random
 
+try:
+    import soundfile
+except ImportError:  # In-process Opus encoding is optional; ffmpeg is used without it
+    soundfile = None
+
+try:
+    import av
+except ImportError:  # PyAV comes with faster-whisper; without it ffmpeg is the fallback encoder
+    av = None
+
 logger = logging.getLogger(__name__)
 
+# Text cleanup for TTS, compiled once
+BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+ITALIC_RE = re.compile(r'\*(.*?)\*')
+CODE_RE = re.compile(r'`(.*?)`')
+HEADER_RE = re.compile(r'#{1,6}\s*')
+URL_RE = re.compile(r'http\S+|www\S+')
+WHITESPACE_RE = re.compile(r'\s+')
+# Emojis and other symbols the TTS models can't read
+UNSPOKEN_RE = re.compile(r'[^\w\s\.,!?;:\-\(\)]+')
+PAUSE_RE = re.compile(r'([.,!?])')
+
+# Hindi words spelled phonetically so the English voice pronounces them right
+HINGLISH_PHONETICS = {
+    'bhai': 'bye'
+}
+HINGLISH_PHONETICS_RE = re.compile('|'.join(map(re.escape, HINGLISH_PHONETICS)))
+
+# Voice notes generated between releases of PyTorch's cached GPU memory
+CUDA_CACHE_RELEASE_INTERVAL = 16
+
+# XTTS-v2 weights (~1.8 GB) shared by every TTSHandler in the process
+_XTTS_MODEL = None
+_XTTS_LOCK = threading.Lock()
+
+def _get_xtts_model(device: str):
+    """Load XTTS-v2 on first use and return the shared instance"""
+    global _XTTS_MODEL
+    with _XTTS_LOCK:
+        if _XTTS_MODEL is None:
+            _XTTS_MODEL = TTS(
+                model_name="tts_models/multilingual/multi-dataset/xtts_v2",
+                progress_bar=False
+            ).to(device)
+            if device == "cuda":
+                # Return the loader's temporary allocations to the driver
+                torch.cuda.empty_cache()
+        return _XTTS_MODEL
+
 class TTSHandler:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.tts_models = {}
-        self._load_tts_models()
+        # One model serves every language; None if nothing could be loaded
+        self.model = None
+        self.supported_languages = ('english', 'hindi', 'hinglish')
+        # Synthesis runs in a worker thread; one generation at a time on the shared model
+        self.model_lock = asyncio.Lock()
+        self.generation_count = 0
         
         # Indian accent reference audio files (you'll need to add these)
         self.indian_voice_samples = {
@@ -22,6 +78,10 @@ class TTSHandler:
             'hinglish': '/path/to/indian_hinglish_voice.wav' # Add Indian Hinglish speaker sample
         }
         
+        # XTTS speaker conditioning per reference wav, as (gpt_cond_latent, speaker_embedding)
+        self.speaker_latents = {}
+        self._load_tts_models()
+        
         # Voice settings for different languages with Indian accent
         self.voice_settings = {
             'hindi': {
@@ -46,33 +106,52 @@ class TTSHandler:
         try:
             # Load XTTS-v2 model (supports voice cloning and multiple languages)
             logger.info("Loading XTTS-v2 model for Indian accent voice cloning...")
-            xtts_model = TTS(
-                model_name="tts_models/multilingual/multi-dataset/xtts_v2",
-                progress_bar=False
-            ).to(self.device)
+            xtts_model = _get_xtts_model(self.device)
             
             # Use the same model for all languages (voice cloning will handle accents)
-            self.tts_models['english'] = xtts_model
-            self.tts_models['hindi'] = xtts_model
-            self.tts_models['hinglish'] = xtts_model
+            self.model = xtts_model
             
             logger.info("XTTS-v2 model loaded successfully for Indian accent synthesis")
+            self._load_speaker_latents(xtts_model)
+            self._warm_up(xtts_model)
             
         except Exception as e:
-            logger.error(f"Error loading XTTS-v2 model: {e}")
+            logger.error("Error loading XTTS-v2 model: %s", e)
             # Fallback to basic models if XTTS-v2 fails
             try:
                 logger.info("Loading fallback TTS models...")
-                fallback_model = TTS("tts_models/en/ljspeech/tacotron2-DDC").to(self.device)
-                self.tts_models['english'] = fallback_model
-                self.tts_models['hindi'] = fallback_model
-                self.tts_models['hinglish'] = fallback_model
+                self.model = TTS("tts_models/en/ljspeech/tacotron2-DDC").to(self.device)
             except Exception as e2:
-                logger.error(f"Failed to load any TTS model: {e2}")
-                self.tts_models = {}
+                logger.error("Failed to load any TTS model: %s", e2)
+                self.model = None
+    
+    def _load_speaker_latents(self, xtts_model):
+        """Encode each reference voice once so synthesis doesn't redo it on every call"""
+        for speaker_wav in set(self.indian_voice_samples.values()):
+            if not os.path.exists(speaker_wav):
+                continue
+            try:
+                self.speaker_latents[speaker_wav] = xtts_model.synthesizer.tts_model.get_conditioning_latents(
+                    audio_path=[speaker_wav]
+                )
+            except Exception as e:
+                logger.error("Error computing speaker latents for %s: %s", speaker_wav, e)
+    
+    def _warm_up(self, xtts_model):
+        """Synthesize a short sentence so kernel setup happens at load time, not on the first voice note"""
+        if not self.speaker_latents:
+            return
+        try:
+            self._synthesize_cloned(xtts_model, "Hello, welcome to the news.", next(iter(self.speaker_latents)), 'en')
+        except Exception as e:
+            logger.warning("XTTS warmup failed: %s", e)
     
     async def generate_voice_note(self, text: str, language: str = 'english', max_duration: int = 30) -> str:
         """Generate voice note with Indian accent using voice cloning"""
+        if self.model is None:
+            logger.error("TTS model not available")
+            return None
+        
         try:
             # Truncate text to fit approximately 30 seconds (about 200-250 words)
             words = text.split()
@@ -82,37 +161,33 @@ class TTSHandler:
             # Clean and prepare text for TTS
             clean_text = self._prepare_text_for_tts(text, language)
             
-            # Get the appropriate TTS model
-            if language not in self.tts_models:
+            if language not in self.supported_languages:
                 language = 'english'  # Fallback to English
             
-            model = self.tts_models[language]
-            
             # Generate voice file with Indian accent
-            voice_path = await self._generate_audio(model, clean_text, language)
+            voice_path = await self._generate_audio(self.model, clean_text, language)
             return voice_path
             
         except Exception as e:
-            logger.error(f"Error generating voice note: {e}")
+            logger.error("Error generating voice note: %s", e)
             return None
     
     def _prepare_text_for_tts(self, text: str, language: str) -> str:
         """Prepare text for TTS conversion"""
         # Remove markdown formatting
-        import re
-        clean_text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Remove bold
-        clean_text = re.sub(r'\*(.*?)\*', r'\1', clean_text)  # Remove italic
-        clean_text = re.sub(r'`(.*?)`', r'\1', clean_text)  # Remove code formatting
-        clean_text = re.sub(r'#{1,6}\s*', '', clean_text)  # Remove headers
+        clean_text = BOLD_RE.sub(r'\1', text)  # Remove bold
+        clean_text = ITALIC_RE.sub(r'\1', clean_text)  # Remove italic
+        clean_text = CODE_RE.sub(r'\1', clean_text)  # Remove code formatting
+        clean_text = HEADER_RE.sub('', clean_text)  # Remove headers
         
         # Remove URLs
-        clean_text = re.sub(r'http\S+|www\S+', '', clean_text)
+        clean_text = URL_RE.sub('', clean_text)
         
         # Remove excessive whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        clean_text = WHITESPACE_RE.sub(' ', clean_text).strip()
         
         # Handle emojis - remove them for better TTS
-        clean_text = re.sub(r'[^\w\s\.,!?;:\-\(\)]+', '', clean_text)
+        clean_text = UNSPOKEN_RE.sub('', clean_text)
         
         # Limit length for TTS (most models have limits)
         if len(clean_text) > 500:
@@ -120,33 +195,22 @@ class TTSHandler:
             clean_text = '. '.join(sentences[:3]) + '.'
         
         # Add pauses for better speech
-        clean_text = clean_text.replace('.', '. ')
-        clean_text = clean_text.replace(',', ', ')
-        clean_text = clean_text.replace('!', '! ')
-        clean_text = clean_text.replace('?', '? ')
+        clean_text = PAUSE_RE.sub(r'\1 ', clean_text)
         
         # Language-specific adjustments
         if language == 'hinglish':
             # Convert some Hindi words to phonetic English for better pronunciation
-            replacements = {
-                'bhai': 'bye',
-                'aaj': 'aaj',
-                'kya': 'kya',
-                'hai': 'hai',
-                'hua': 'hua',
-                'yaar': 'yaar'
-            }
-            for hindi, phonetic in replacements.items():
-                clean_text = clean_text.replace(hindi, phonetic)
+            clean_text = HINGLISH_PHONETICS_RE.sub(lambda m: HINGLISH_PHONETICS[m.group(0)], clean_text)
         
         return clean_text
     
     async def _generate_audio(self, model, text: str, language: str) -> str:
         """Generate audio with Indian accent using voice cloning"""
+        ogg_path = None
         try:
             # Create temporary file for output
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                wav_path = tmp_file.name
+            with tempfile.NamedTemporaryFile(prefix="voice_note_", suffix=".ogg", delete=False) as tmp_file:
+                ogg_path = tmp_file.name
             
             # Get voice settings for the language
             voice_config = self.voice_settings.get(language, self.voice_settings['english'])
@@ -154,43 +218,116 @@ class TTSHandler:
             target_language = voice_config.get('language', 'en')
             
             # Generate speech with Indian accent voice cloning
-            if speaker_wav and os.path.exists(speaker_wav):
-                # Use voice cloning with Indian accent reference
-                model.tts_to_file(
-                    text=text,
-                    file_path=wav_path,
-                    speaker_wav=speaker_wav,
-                    language=target_language,
-                    split_sentences=True  # Better for longer texts
-                )
-                logger.info(f"Generated audio with Indian accent voice cloning: {language}")
-            else:
-                # Fallback to default model without voice cloning
-                logger.warning(f"Indian voice sample not found for {language}, using default")
-                model.tts_to_file(text=text, file_path=wav_path)
+            async with self.model_lock:
+                if speaker_wav in self.speaker_latents:
+                    # Use voice cloning with the precomputed Indian accent conditioning
+                    wav = await asyncio.to_thread(
+                        self._run_synthesis,
+                        self._synthesize_cloned,
+                        model,
+                        text,
+                        speaker_wav,
+                        target_language
+                    )
+                    logger.debug("Generated audio with Indian accent voice cloning: %s", language)
+                else:
+                    # Fallback to default model without voice cloning
+                    logger.warning("Indian voice sample not found for %s, using default", language)
+                    wav = await asyncio.to_thread(self._run_synthesis, model.tts, text=text)
             
-            # Convert to OGG format for Telegram
-            ogg_path = wav_path.replace('.wav', '.ogg')
-            success = await self._convert_to_ogg(wav_path, ogg_path)
-            
-            # Clean up WAV file
-            if os.path.exists(wav_path):
-                os.remove(wav_path)
+            # Encode the waveform to OGG/Opus for Telegram in-process; ffmpeg only if that isn't possible
+            sample_rate = model.synthesizer.output_sample_rate
+            success = await asyncio.to_thread(self._encode_ogg, wav, sample_rate, ogg_path)
+            if not success:
+                success = await self._convert_to_ogg(model, wav, sample_rate, ogg_path)
             
+            if not success:
+                os.unlink(ogg_path)
             return ogg_path if success else None
             
         except Exception as e:
-            logger.error(f"Error generating audio: {e}")
+            logger.error("Error generating audio: %s", e)
+            if ogg_path and os.path.exists(ogg_path):
+                os.unlink(ogg_path)
             return None
     
-    async def _convert_to_ogg(self, input_path: str, output_path: str) -> bool:
-        """Convert audio file to OGG format for Telegram"""
+    def _run_synthesis(self, synthesize, *args, **kwargs) -> np.ndarray:
+        """Run a synthesis call, periodically releasing cached CUDA memory (blocking, called under model_lock)"""
         try:
-            # Try using ffmpeg if available
-            import subprocess
-            
+            return synthesize(*args, **kwargs)
+        finally:
+            self.generation_count += 1
+            if self.device == "cuda" and self.generation_count % CUDA_CACHE_RELEASE_INTERVAL == 0:
+                # The caching allocator never shrinks on its own; collect stray tensors and return freed blocks
+                gc.collect()
+                torch.cuda.empty_cache()
+    
+    def _synthesize_cloned(self, model, text: str, speaker_wav: str, language: str) -> np.ndarray:
+        """Synthesize with cached speaker latents (blocking, called from a worker thread)"""
+        gpt_cond_latent, speaker_embedding = self.speaker_latents[speaker_wav]
+        # No autograd bookkeeping, and half-precision matmuls on GPU; CPU stays in fp32
+        with torch.inference_mode(), torch.autocast(
+            device_type="cuda",
+            dtype=self._autocast_dtype(),
+            enabled=self.device == "cuda"
+        ):
+            output = model.synthesizer.tts_model.inference(
+                text,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                enable_text_splitting=True  # Better for longer texts
+            )
+        return output['wav']
+    
+    def _encode_ogg(self, wav, sample_rate: int, ogg_path: str) -> bool:
+        """Encode a waveform straight to OGG/Opus (blocking, called from a worker thread)"""
+        samples = np.asarray(wav, dtype=np.float32)
+        if soundfile is not None:
+            try:
+                soundfile.write(ogg_path, samples, sample_rate, format='OGG', subtype='OPUS')
+                return True
+            except Exception as e:
+                # Older libsndfile builds lack Opus, and Opus only takes 8/12/16/24/48 kHz audio
+                logger.debug("libsndfile Opus encoding failed: %s", e)
+        
+        if av is not None:
+            try:
+                self._encode_ogg_av(samples, sample_rate, ogg_path)
+                return True
+            except Exception as e:
+                logger.warning("PyAV Opus encoding failed: %s", e)
+        
+        logger.warning("In-process Opus encoding unavailable, using ffmpeg")
+        return False
+    
+    def _encode_ogg_av(self, samples: np.ndarray, sample_rate: int, ogg_path: str):
+        """Encode mono float samples to OGG/Opus with PyAV's bundled libopus"""
+        with av.open(ogg_path, 'w', format='ogg') as container:
+            # The encoder resamples to 48 kHz and re-frames the audio itself
+            stream = container.add_stream('libopus', rate=48000, layout='mono')
+            stream.bit_rate = 64000
+            frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format='flt', layout='mono')
+            frame.sample_rate = sample_rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            # Flush the encoder
+            for packet in stream.encode(None):
+                container.mux(packet)
+    
+    def _autocast_dtype(self) -> torch.dtype:
+        """Half precision for GPU synthesis: bf16 where supported (Ampere+), fp16 otherwise"""
+        if self.device == "cuda" and torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return torch.float16
+    
+    async def _convert_to_ogg(self, model, wav, sample_rate: int, output_path: str) -> bool:
+        """Convert a waveform to OGG format for Telegram with ffmpeg"""
+        try:
+            # Raw float samples go in over stdin, so no intermediate wav file is written
             cmd = [
-                'ffmpeg', '-i', input_path, 
+                'ffmpeg',
+                '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
                 '-c:a', 'libopus', 
                 '-b:a', '64k',
                 '-y',  # Overwrite output file
@@ -199,32 +336,32 @@ class TTSHandler:
             
             process = await asyncio.create_subprocess_exec(
                 *cmd,
-                stdout=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await process.communicate()
+            _, stderr = await process.communicate(np.asarray(wav, dtype=np.float32).tobytes())
             
             if process.returncode == 0:
                 return True
             else:
-                logger.warning(f"FFmpeg conversion failed: {stderr.decode()}")
+                logger.warning("FFmpeg conversion failed: %s", stderr.decode())
                 return False
                 
         except Exception as e:
-            logger.warning(f"Could not convert to OGG (ffmpeg not available?): {e}")
-            # If conversion fails, just use the original file
+            logger.warning("Could not convert to OGG (ffmpeg not available?): %s", e)
+            # If conversion fails, just send uncompressed audio
             try:
-                import shutil
-                shutil.copy2(input_path, output_path)
+                await asyncio.to_thread(model.synthesizer.save_wav, wav, output_path)
                 return True
-            except:
+            except Exception:
                 return False
     
     def get_available_languages(self) -> list:
         """Get list of available TTS languages"""
-        return list(self.tts_models.keys())
+        return list(self.supported_languages) if self.model is not None else []
     
     def is_language_supported(self, language: str) -> bool:
         """Check if a language is supported"""
-        return language in self.tts_models
\ No newline at end of file
+        return self.model is not None and language in self.supported_languages
\ No newline at end of file
@@ -1,31 +1,80 @@
 import sqlite3
 import json
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Most users kept in the in-memory preference cache before the oldest are dropped
+PREF_CACHE_MAX_USERS = 10000
+
+# Stored in PRAGMA user_version once the schema migrations below have run
+SCHEMA_VERSION = 1
+
+# Preferences with one row per followed topic (topic is NULL for users without any), in the order they were added
+PREFERENCES_QUERY = """
+    SELECT p.user_id, p.language, p.frequency, t.topic
+    FROM user_preferences p LEFT JOIN user_topics t ON t.user_id = p.user_id
+"""
+
+# Upsert per writable column, built once so no caller-supplied name is ever formatted into SQL
+PREFERENCE_UPSERTS = {
+    column: f"""
+        INSERT INTO user_preferences (user_id, {column}) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET {column} = excluded.{column}, updated_at = CURRENT_TIMESTAMP
+    """
+    for column in ('language', 'frequency', 'setup_complete')
+}
+
 class UserPreferences:
     def __init__(self, db_path: str = "news_bhai.db"):
         self.db_path = db_path
+        # One long-lived connection so SQLite's page cache survives between calls
+        self.conn = self._connect()
+        self.lock = threading.Lock()
+        # Preferences cached in memory (LRU), invalidated whenever they're written
+        self.pref_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared database connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+        return conn
+    
+    def close(self):
+        """Close the shared database connection"""
+        with self.lock:
+            self.conn.close()
+    
     def init_database(self):
         """Initialize the SQLite database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.lock, self.conn as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS user_preferences (
                         user_id INTEGER PRIMARY KEY,
                         language TEXT DEFAULT 'english',
-                        topics TEXT DEFAULT '[]',
                         frequency TEXT DEFAULT 'daily',
                         setup_complete INTEGER DEFAULT 0,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
+                # One row per followed topic, so adding or removing one touches a single row
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS user_topics (
+                        user_id INTEGER NOT NULL,
+                        topic TEXT NOT NULL,
+                        PRIMARY KEY (user_id, topic)
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_topic_users ON user_topics(topic)")
                 
                 # Add setup_complete column to existing tables if it doesn't exist
                 cursor.execute("PRAGMA table_info(user_preferences)")
@@ -33,130 +82,205 @@ class UserPreferences:
                 if 'setup_complete' not in columns:
                     cursor.execute("ALTER TABLE user_preferences ADD COLUMN setup_complete INTEGER DEFAULT 0")
                 
-                conn.commit()
+                # Move topics out of the old JSON column into user_topics, once per database
+                cursor.execute("PRAGMA user_version")
+                schema_version = cursor.fetchone()[0]
+                if schema_version < 1 and 'topics' in columns:
+                    cursor.execute("SELECT user_id, topics FROM user_preferences WHERE topics IS NOT NULL")
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO user_topics (user_id, topic) VALUES (?, ?)",
+                        [
+                            (user_id, topic)
+                            for user_id, topics_json in cursor.fetchall()
+                            for topic in json.loads(topics_json or '[]')
+                        ]
+                    )
+                    # No DROP COLUMN before SQLite 3.35; the old column is then left unused
+                    if sqlite3.sqlite_version_info >= (3, 35, 0):
+                        cursor.execute("ALTER TABLE user_preferences DROP COLUMN topics")
+                    logger.info("Migrated user topics to the user_topics table")
+                if schema_version < SCHEMA_VERSION:
+                    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                
+                # Scheduled runs and the startup broadcast select users by these columns
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_frequency ON user_preferences(frequency)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_setup ON user_preferences(setup_complete)")
+                
                 logger.info("Database initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing database: {e}")
+            logger.error("Error initializing database: %s", e)
     
     def get_user_preferences(self, user_id: int) -> Dict[str, Any]:
+        """Get user preferences, served from memory after the first database read"""
+        prefs = self.pref_cache.get(user_id)
+        if prefs is None:
+            prefs = self._load_user_preferences(user_id)
+            if prefs is None:
+                return {'language': 'english', 'topics': [], 'frequency': 'daily'}
+            self.pref_cache[user_id] = prefs
+            if len(self.pref_cache) > PREF_CACHE_MAX_USERS:
+                self.pref_cache.popitem(last=False)
+        else:
+            self.pref_cache.move_to_end(user_id)
+        
+        # Return a copy so callers can't mutate the cached entry
+        return {**prefs, 'topics': list(prefs['topics'])}
+    
+    def _load_user_preferences(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user preferences from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT language, topics, frequency FROM user_preferences WHERE user_id = ?",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(f"{PREFERENCES_QUERY} WHERE p.user_id = ? ORDER BY t.rowid", (user_id,))
+                prefs = self._prefs_from_rows(cursor.fetchall())
                 
-                if result:
-                    language, topics_json, frequency = result
-                    topics = json.loads(topics_json) if topics_json else []
-                    return {
-                        'language': language,
-                        'topics': topics,
-                        'frequency': frequency
-                    }
-                else:
-                    # Return default preferences for new users
-                    return {
-                        'language': 'english',
-                        'topics': [],
-                        'frequency': 'daily'
-                    }
+                # Return default preferences for new users
+                return prefs.get(user_id, {
+                    'language': 'english',
+                    'topics': [],
+                    'frequency': 'daily'
+                })
         except Exception as e:
-            logger.error(f"Error getting user preferences: {e}")
-            return {'language': 'english', 'topics': [], 'frequency': 'daily'}
+            logger.error("Error getting user preferences: %s", e)
+            return None
+    
+    def get_preferences_bulk(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get preferences for many users with one query per batch instead of one per user"""
+        result = {}
+        missing = []
+        for user_id in user_ids:
+            if user_id in self.pref_cache:
+                result[user_id] = self.get_user_preferences(user_id)
+            else:
+                missing.append(user_id)
+        
+        try:
+            with self.lock:
+                cursor = self.conn.cursor()
+                # Stay under SQLite's limit on bound parameters
+                for start in range(0, len(missing), 900):
+                    batch = missing[start:start + 900]
+                    placeholders = ','.join('?' * len(batch))
+                    cursor.execute(
+                        f"{PREFERENCES_QUERY} WHERE p.user_id IN ({placeholders}) ORDER BY t.rowid",
+                        batch
+                    )
+                    result.update(self._prefs_from_rows(cursor.fetchall()))
+        except Exception as e:
+            logger.error("Error getting preferences in bulk: %s", e)
+        
+        # Users without a row (or whose batch failed) get the defaults
+        for user_id in missing:
+            result.setdefault(user_id, {'language': 'english', 'topics': [], 'frequency': 'daily'})
+        return result
+    
+    @staticmethod
+    def _prefs_from_rows(rows) -> Dict[int, Dict[str, Any]]:
+        """Collect PREFERENCES_QUERY rows into preferences per user"""
+        prefs = {}
+        for user_id, language, frequency, topic in rows:
+            user_prefs = prefs.get(user_id)
+            if user_prefs is None:
+                user_prefs = prefs[user_id] = {'language': language, 'topics': [], 'frequency': frequency}
+            if topic is not None:
+                user_prefs['topics'].append(topic)
+        return prefs
     
     def update_user_preference(self, user_id: int, key: str, value: Any) -> bool:
         """Update a specific user preference"""
+        if key == 'topics':
+            return self.set_user_topics(user_id, value)
+        if key not in PREFERENCE_UPSERTS:
+            raise ValueError(f"Unknown preference: {key}")
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.lock, self.conn as conn:
                 cursor = conn.cursor()
                 
-                # Check if user exists
-                cursor.execute("SELECT user_id FROM user_preferences WHERE user_id = ?", (user_id,))
-                user_exists = cursor.fetchone() is not None
-                
-                if key == 'topics':
-                    value = json.dumps(value) if isinstance(value, list) else value
+                # Insert new users with the column defaults, or update the one column, in a single statement
+                cursor.execute(PREFERENCE_UPSERTS[key], (user_id, value))
                 
-                if user_exists:
-                    # Update existing user
-                    cursor.execute(
-                        f"UPDATE user_preferences SET {key} = ?, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
-                        (value, user_id)
-                    )
-                else:
-                    # Insert new user with default values
-                    defaults = {
-                        'language': 'english',
-                        'topics': '[]',
-                        'frequency': 'daily'
-                    }
-                    defaults[key] = value
-                    
-                    cursor.execute(
-                        "INSERT INTO user_preferences (user_id, language, topics, frequency) VALUES (?, ?, ?, ?)",
-                        (user_id, defaults['language'], defaults['topics'], defaults['frequency'])
-                    )
-                
-                conn.commit()
-                logger.info(f"Updated {key} for user {user_id}")
+                self.pref_cache.pop(user_id, None)
+                logger.info("Updated %s for user %s", key, user_id)
                 return True
                 
         except Exception as e:
-            logger.error(f"Error updating user preference: {e}")
+            logger.error("Error updating user preference: %s", e)
+            return False
+    
+    def set_user_topics(self, user_id: int, topics: List[str]) -> bool:
+        """Replace user's interests with the given topics in one transaction"""
+        try:
+            with self.lock, self.conn as conn:
+                conn.execute("INSERT OR IGNORE INTO user_preferences (user_id) VALUES (?)", (user_id,))
+                conn.execute("DELETE FROM user_topics WHERE user_id = ?", (user_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO user_topics (user_id, topic) VALUES (?, ?)",
+                    [(user_id, topic) for topic in topics]
+                )
+                self.pref_cache.pop(user_id, None)
+                logger.info("Updated topics for user %s", user_id)
+                return True
+        except Exception as e:
+            logger.error("Error setting topics: %s", e)
             return False
     
     def add_user_topic(self, user_id: int, topic: str) -> bool:
         """Add a topic to user's interests"""
         try:
-            prefs = self.get_user_preferences(user_id)
-            topics = prefs.get('topics', [])
-            
-            if topic not in topics:
-                topics.append(topic)
-                return self.update_user_preference(user_id, 'topics', topics)
-            return True
+            with self.lock, self.conn as conn:
+                # Users who pick topics first still get a preferences row with the defaults
+                conn.execute("INSERT OR IGNORE INTO user_preferences (user_id) VALUES (?)", (user_id,))
+                conn.execute("INSERT OR IGNORE INTO user_topics (user_id, topic) VALUES (?, ?)", (user_id, topic))
+                self.pref_cache.pop(user_id, None)
+                return True
         except Exception as e:
-            logger.error(f"Error adding topic: {e}")
+            logger.error("Error adding topic: %s", e)
             return False
     
     def remove_user_topic(self, user_id: int, topic: str) -> bool:
         """Remove a topic from user's interests"""
         try:
-            prefs = self.get_user_preferences(user_id)
-            topics = prefs.get('topics', [])
-            
-            if topic in topics:
-                topics.remove(topic)
-                return self.update_user_preference(user_id, 'topics', topics)
-            return True
+            with self.lock, self.conn as conn:
+                conn.execute("DELETE FROM user_topics WHERE user_id = ? AND topic = ?", (user_id, topic))
+                self.pref_cache.pop(user_id, None)
+                return True
         except Exception as e:
-            logger.error(f"Error removing topic: {e}")
+            logger.error("Error removing topic: %s", e)
             return False
     
     def get_all_users_by_frequency(self, frequency: str) -> List[int]:
         """Get all users with a specific update frequency"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self.lock:
+                cursor = self.conn.cursor()
                 cursor.execute(
                     "SELECT user_id FROM user_preferences WHERE frequency = ?",
                     (frequency,)
                 )
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            logger.error(f"Error getting users by frequency: {e}")
+            logger.error("Error getting users by frequency: %s", e)
             return []
+    
+    def get_preferences_by_frequency(self, frequency: str) -> Dict[int, Dict[str, Any]]:
+        """Get preferences of every user with a specific update frequency in one query"""
+        try:
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(f"{PREFERENCES_QUERY} WHERE p.frequency = ? ORDER BY t.rowid", (frequency,))
+                return self._prefs_from_rows(cursor.fetchall())
+        except Exception as e:
+            logger.error("Error getting preferences by frequency: %s", e)
+            return {}
+    
     def get_user_topics(self, user_id: int) -> List[str]:
         """Get user's selected topics"""
         try:
             prefs = self.get_user_preferences(user_id)
             return prefs.get('topics', [])
         except Exception as e:
-            logger.error(f"Error getting user topics: {e}")
+            logger.error("Error getting user topics: %s", e)
             return []    
     # Remove duplicate get_user_topics method
     
@@ -167,15 +291,12 @@ class UserPreferences:
     def get_active_users(self):
         """Get list of active user IDs"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get users who have completed setup
-            cursor.execute("SELECT user_id FROM user_preferences WHERE setup_complete = 1")
-            active_users = [row[0] for row in cursor.fetchall()]
-            
-            conn.close()
-            return active_users
+            with self.lock:
+                cursor = self.conn.cursor()
+                
+                # Get users who have completed setup
+                cursor.execute("SELECT user_id FROM user_preferences WHERE setup_complete = 1")
+                return [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            logger.error(f"Error getting active users: {e}")
+            logger.error("Error getting active users: %s", e)
             return []
\ No newline at end of file